@@ -0,0 +1,33 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+# Run with any ASGI server, e.g.:
+#   $ uvicorn asgi:application
+
+from pyengineer import Configuration, GUIApplication
+from pyengineer.ASGIApplication import ASGIApplication
+from pyengineer.PluginProcessPool import PluginProcessPool
+
+config = Configuration("configuration.json")
+request_pool_options = config.request_pool or { }
+request_pool = PluginProcessPool(config.filename, max_workers = request_pool_options.get("workers"), timeout = request_pool_options.get("timeout", 10), max_batch_timeout = request_pool_options.get("max_batch_timeout", 60), startup_timeout = request_pool_options.get("startup_timeout", 60))
+gui_application = GUIApplication(config, request_pool = request_pool)
+application = ASGIApplication(gui_application.app, on_shutdown = request_pool.shutdown)
@@ -19,6 +19,7 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import heapq
 from pyengineer import BasePlugin, UnitValue, InputDataException
 
 _form_template = """
@@ -51,34 +52,49 @@ class Plugin(BasePlugin):
 	_MENU_HIERARCHY = ("Basics", "Parallel Resistor")
 	_FORM_TEMPLATE = _form_template
 	_RESPONSE_TEMPLATE = _response_template
+	_CACHEABLE = True
+	_CPU_INTENSIVE = True
 
-	def request(self, endpoint, parameters):
-		r = UnitValue(parameters["r"])
-		r_set = self.config.get_valuesets("r")[parameters["r_set"]]
-
-		options = [ ]
-		for r1 in r_set:
-			if r1 == r:
-				continue
-			ideal_r2 = 1 / ((1 / float(r)) - (1 / float(r1)))
-			for r2 in r_set.iter_closest(ideal_r2):
+	@staticmethod
+	def _iter_candidates(r, r_set):
+		"""Yields (key, r1_index, r2_index, r_total, error, ratio) for all
+		candidate pairs, working on plain floats only. For every R1, all
+		ideal R2 values are snapped to their neighbours in the set in a
+		single pass."""
+		float_index = r_set.float_index
+		r1_indices = [ index for (index, r1) in enumerate(float_index) if r1 != r ]
+		ideal_r2_values = [ 1 / ((1 / r) - (1 / float_index[index])) for index in r1_indices ]
+		(smaller_indices, larger_indices) = r_set.find_closest_many(ideal_r2_values)
+		for (r1_index, smaller_index, larger_index) in zip(r1_indices, smaller_indices, larger_indices):
+			r1 = float_index[r1_index]
+			for r2_index in (smaller_index, larger_index):
+				if r2_index is None:
+					continue
+				r2 = float_index[r2_index]
 				if r2 < r1:
 					continue
-				r_total = 1 / ((1 / float(r1)) + (1 / float(r2)))
-				error = (r_total - float(r)) / float(r)
+				r_total = 1 / ((1 / r1) + (1 / r2))
+				error = (r_total - r) / r
 				if abs(error) > 0.75:
 					continue
-				option = {
-					"r1":		UnitValue(r1).to_dict(),
-					"r2":		UnitValue(r2).to_dict(),
-					"r":		UnitValue(r_total, repr_callback = lambda v: v.format(significant_digits = 4)).to_dict(include_repr = True),
-					"error":	error,
-					"ratio":	float(r2) / float(r1),
-				}
-				options.append(option)
-		options.sort(key = lambda o: (abs(o["error"]), o["ratio"]))
+				ratio = r2 / r1
+				yield ((abs(error), ratio), r1_index, r2_index, r_total, error, ratio)
+
+	def request(self, endpoint, parameters):
+		r = UnitValue(parameters["r"])
+		r_set = self.config.get_valuesets("r")[parameters["r_set"]]
+
+		# Only the best candidates are ever converted back to UnitValues
+		best = heapq.nsmallest(15, self._iter_candidates(float(r), r_set), key = lambda candidate: candidate[0])
+		options = [ {
+			"r1":		UnitValue(r_set[r1_index]).to_dict(),
+			"r2":		UnitValue(r_set[r2_index]).to_dict(),
+			"r":		UnitValue(r_total, repr_callback = lambda v: v.format(significant_digits = 4)).to_dict(include_repr = True),
+			"error":	error,
+			"ratio":	ratio,
+		} for (key, r1_index, r2_index, r_total, error, ratio) in best ]
 		return {
-			"options" : options[ : 15],
+			"options" : options,
 		}
 
 if __name__ == "__main__":
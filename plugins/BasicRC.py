@@ -80,6 +80,7 @@ class Plugin(BasePlugin):
 	_MENU_HIERARCHY = ("Basics", "RC Circuit")
 	_FORM_TEMPLATE = _form_template
 	_RESPONSE_TEMPLATE = _response_template
+	_CPU_INTENSIVE = True
 
 	def request(self, endpoint, parameters):
 		t1 = UnitValue(parameters["t1"])
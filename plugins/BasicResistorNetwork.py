@@ -0,0 +1,102 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import threading
+from pyengineer import BasePlugin, UnitValue, InputDataException
+from pyengineer.ResistorNetworkSynthesis import ResistorNetworkSynthesis
+
+_form_template = """
+<form id="input_data">
+	${input_text("r", "Resistor", righthand_side = "Ω")}
+	${input_set("r_set", "Resistor set", valueset_group_name = "r")}
+	${input_customset("max_parts", "Parts", values = [
+		("4", "Up to 4 resistors"),
+		("3", "Up to 3 resistors"),
+		("2", "Up to 2 resistors"),
+	])}
+	${submit_button("Calculate")}
+</form>
+"""
+
+_response_template = """
+${result_table_begin("Network", "Parts", "R", "Error")}
+
+%for option in d["options"]:
+<tr>
+	<td>${option["network"]}</td>
+	<td>${option["parts"]}</td>
+	<td>${option["r"]["repr"]}</td>
+	<td>${"%+.3g%%" % (100 * option["error"])}</td>
+</tr>
+%endfor
+
+${result_table_end()}
+"""
+
+class Plugin(BasePlugin):
+	_ID = "c776f4b0-dcb1-496a-9e36-0dcc42fc1a3b"
+	_TITLE = "Resistor Network Synthesis"
+	_MENU_HIERARCHY = ("Basics", "Resistor Network")
+	_FORM_TEMPLATE = _form_template
+	_RESPONSE_TEMPLATE = _response_template
+	_CACHEABLE = True
+	_CPU_INTENSIVE = True
+
+	# The pair table of a resistor set is computed once and then reused for
+	# all searches within that set
+	_SYNTHESIS = { }
+	_SYNTHESIS_LOCK = threading.Lock()
+
+	def _get_synthesis(self, r_set):
+		with self._SYNTHESIS_LOCK:
+			if r_set not in self._SYNTHESIS:
+				self._SYNTHESIS[r_set] = ResistorNetworkSynthesis(r_set.float_index)
+			return self._SYNTHESIS[r_set]
+
+	@staticmethod
+	def _format_value(value):
+		return UnitValue(value).format() + "Ω"
+
+	def request(self, endpoint, parameters):
+		r = UnitValue(parameters["r"])
+		if float(r) <= 0:
+			raise InputDataException("Resistor value must be positive.")
+		max_parts = int(parameters["max_parts"])
+		r_set = self.config.get_valuesets("r")[parameters["r_set"]]
+
+		synthesis = self._get_synthesis(r_set)
+		if not (1 <= max_parts <= synthesis.max_parts):
+			raise InputDataException("Networks may consist of at most %d resistors." % (synthesis.max_parts))
+
+		options = [ {
+			"network":	ResistorNetworkSynthesis.format_topology(result.topology, self._format_value),
+			"parts":	result.part_count,
+			"r":		UnitValue(result.value, repr_callback = lambda v: v.format(significant_digits = 6)).to_dict(include_repr = True),
+			"error":	result.error,
+		} for result in synthesis.search(r, max_parts = max_parts, count = 15) ]
+		return {
+			"options" : options,
+		}
+
+if __name__ == "__main__":
+	from pyengineer import Configuration
+	plugin = Plugin(Configuration("configuration.json"), instanciated_from = __file__)
+	plugin.dump_request({ "r": "12345", "r_set": "E12", "max_parts": "4" })
@@ -55,6 +55,8 @@ class Plugin(BasePlugin):
 	_MENU_HIERARCHY = ("Basics", "Voltage Divider")
 	_FORM_TEMPLATE = _form_template
 	_RESPONSE_TEMPLATE = _response_template
+	_CACHEABLE = True
+	_CPU_INTENSIVE = True
 
 	def request(self, endpoint, parameters):
 		v_in = UnitValue(parameters["v_in"])
@@ -67,9 +69,10 @@ class Plugin(BasePlugin):
 		ideal_r1 = float(r_sum) * (float(v_out)) / float(v_in)
 		min_r1 = ideal_r1 * (1 - r_tolerance)
 		max_r1 = ideal_r1 * (1 + r_tolerance)
-		for r1 in r_set.iter_range(min_r1, max_r1):
-			ideal_r2 = float(r1) * (float(v_in) - float(v_out)) / float(v_out)
-			for r2 in r_set.iter_closest(ideal_r2):
+		r1_values = list(r_set.iter_range(min_r1, max_r1))
+		ideal_r2_values = [ float(r1) * (float(v_in) - float(v_out)) / float(v_out) for r1 in r1_values ]
+		for (r1, r2_candidates) in zip(r1_values, r_set.iter_closest_many(ideal_r2_values)):
+			for r2 in r2_candidates:
 				opt_v_out = float(v_in) * float(r1) / (float(r1) + float(r2))
 				opt_r_sum = float(r1) + float(r2)
 				opt_i = float(v_in) / opt_r_sum
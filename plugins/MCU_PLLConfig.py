@@ -19,6 +19,7 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import heapq
 from pyengineer import BasePlugin, UnitValue
 from pyengineer.SortedList import SortedList
 
@@ -53,6 +54,8 @@ class Plugin(BasePlugin):
 	_MENU_HIERARCHY = ("MCUs", "PLL Calculator")
 	_FORM_TEMPLATE = _form_template
 	_RESPONSE_TEMPLATE = _response_template
+	_CACHEABLE = True
+	_CPU_INTENSIVE = True
 
 	@staticmethod
 	def _parse_ckfield(text):
@@ -70,13 +73,12 @@ class Plugin(BasePlugin):
 			values |= set(_parse_subfield(field))
 		return values
 
-	def request(self, endpoint, parameters):
+	def _iter_results(self, parameters):
 		f_in = UnitValue(parameters["f_in"])
 		f_out = UnitValue(parameters["f_out"])
 		multipliers = self._parse_ckfield(parameters["mul"])
 		dividers = SortedList(self._parse_ckfield(parameters["div"]))
 
-		results = [ ]
 		ratio = float(f_out) / float(f_in)
 		for multiplier in multipliers:
 			ideal_divider = multiplier/ ratio
@@ -90,11 +92,25 @@ class Plugin(BasePlugin):
 					"f_out":		UnitValue(f_result).to_dict(),
 					"error":		error,
 				}
-				results.append(result)
-		results.sort(key = lambda result: abs(result["error"]))
+				yield result
+
+	@staticmethod
+	def _sort_key(result):
+		return abs(result["error"])
 
+	def request(self, endpoint, parameters):
+		results = list(self._iter_results(parameters))
+		results.sort(key = self._sort_key)
 		return results
 
+	def request_stream(self, endpoint, parameters, limit = None):
+		results = self._iter_results(parameters)
+		if limit is None:
+			# Same order as request(), i.e., best match first
+			yield from sorted(results, key = self._sort_key)
+		else:
+			yield from heapq.nsmallest(limit, results, key = self._sort_key)
+
 if __name__ == "__main__":
 	from pyengineer import Configuration
 	plugin = Plugin(Configuration("configuration.json"), instanciated_from = __file__)
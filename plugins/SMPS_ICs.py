@@ -63,6 +63,8 @@ class Plugin(BasePlugin):
 	_MENU_HIERARCHY = ("SMPS", "SMPS ICs")
 	_FORM_TEMPLATE = _form_template
 	_RESPONSE_TEMPLATE = _response_template
+	_CACHEABLE = True
+	_CPU_INTENSIVE = True
 	_VOUT = {
 		"lm2596-25degc":	(1.2, 37),
 		"lm2596-full":		(1.2, 37),
@@ -132,9 +134,10 @@ class Plugin(BasePlugin):
 		# r2 = r1 / ((vout / vref) - 1)
 
 		options = [ ]
-		for r1 in r_set.iter_range(r1_rangemin, r1_rangemax):
-			ideal_r2 = self._get_r2(ic_name = part, vref = v_ref_typ, r1 = float(r1), v_out = float(v_out))
-			for r2 in r_set.iter_closest(ideal_r2):
+		r1_values = list(r_set.iter_range(r1_rangemin, r1_rangemax))
+		ideal_r2_values = [ self._get_r2(ic_name = part, vref = v_ref_typ, r1 = float(r1), v_out = float(v_out)) for r1 in r1_values ]
+		for (r1, r2_candidates) in zip(r1_values, r_set.iter_closest_many(ideal_r2_values)):
+			for r2 in r2_candidates:
 				r1_min = float(r1) * (1 - r_tolerance)
 				r1_max = float(r1) * (1 + r_tolerance)
 				r2_min = float(r2) * (1 - r_tolerance)
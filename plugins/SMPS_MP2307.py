@@ -68,6 +68,8 @@ class Plugin(BasePlugin):
 	_MENU_HIERARCHY = ("SMPS", "MP2307")
 	_FORM_TEMPLATE = _form_template
 	_RESPONSE_TEMPLATE = _response_template
+	_CACHEABLE = True
+	_CPU_INTENSIVE = True
 
 	def request(self, endpoint, parameters):
 		v_out = UnitValue(parameters["v_out"])
@@ -78,9 +80,10 @@ class Plugin(BasePlugin):
 		f = 325e3
 
 		options = [ ]
-		for r2 in r_set.iter_range(500, 50000):
-			ideal_r1 = (float(v_out) / 0.925 * float(r2)) - float(r2)
-			for r1 in r_set.iter_closest(ideal_r1):
+		r2_values = list(r_set.iter_range(500, 50000))
+		ideal_r1_values = [ (float(v_out) / 0.925 * float(r2)) - float(r2) for r2 in r2_values ]
+		for (r2, r1_candidates) in zip(r2_values, r_set.iter_closest_many(ideal_r1_values)):
+			for r1 in r1_candidates:
 				actual_v_out = 0.925 * (float(r1) + float(r2)) / float(r2)
 				error = (actual_v_out - float(v_out)) / float(v_out)
 				option = {
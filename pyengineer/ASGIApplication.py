@@ -0,0 +1,143 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import io
+import sys
+import asyncio
+import concurrent.futures
+
+class ASGIApplication(object):
+	"""Serves a WSGI application (i.e., the Flask app of GUIApplication)
+	through ASGI. Request bodies are received and buffered responses are
+	sent from the event loop, so slow clients do not tie up a thread; only
+	the actual request handling runs in a bounded thread pool."""
+	def __init__(self, wsgi_app, max_threads = 16, on_shutdown = None):
+		self._wsgi_app = wsgi_app
+		self._executor = concurrent.futures.ThreadPoolExecutor(max_workers = max_threads)
+		self._on_shutdown = on_shutdown
+
+	async def __call__(self, scope, receive, send):
+		if scope["type"] == "lifespan":
+			await self._serve_lifespan(receive, send)
+		elif scope["type"] == "http":
+			await self._serve_http(scope, receive, send)
+		elif scope["type"] == "websocket":
+			# Not supported; closing before accepting rejects the handshake
+			message = await receive()
+			if message["type"] == "websocket.connect":
+				await send({ "type": "websocket.close", "code": 1000 })
+
+	async def _serve_lifespan(self, receive, send):
+		while True:
+			message = await receive()
+			if message["type"] == "lifespan.startup":
+				await send({ "type": "lifespan.startup.complete" })
+			elif message["type"] == "lifespan.shutdown":
+				self._executor.shutdown(wait = False)
+				if self._on_shutdown is not None:
+					self._on_shutdown()
+				await send({ "type": "lifespan.shutdown.complete" })
+				return
+
+	@staticmethod
+	async def _receive_body(receive):
+		chunks = [ ]
+		while True:
+			message = await receive()
+			if message["type"] == "http.disconnect":
+				return None
+			chunks.append(message.get("body", b""))
+			if not message.get("more_body", False):
+				return b"".join(chunks)
+
+	@staticmethod
+	def _create_environ(scope, body):
+		(server_name, server_port) = scope.get("server") or ("localhost", 80)
+		environ = {
+			"REQUEST_METHOD":		scope["method"],
+			"SCRIPT_NAME":			scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+			"PATH_INFO":			scope["path"].encode("utf-8").decode("latin-1"),
+			"QUERY_STRING":			scope.get("query_string", b"").decode("latin-1"),
+			"SERVER_NAME":			server_name,
+			"SERVER_PORT":			str(server_port),
+			"SERVER_PROTOCOL":		"HTTP/%s" % (scope.get("http_version", "1.1")),
+			"CONTENT_LENGTH":		str(len(body)),
+			"wsgi.version":			(1, 0),
+			"wsgi.url_scheme":		scope.get("scheme", "http"),
+			"wsgi.input":			io.BytesIO(body),
+			"wsgi.errors":			sys.stderr,
+			"wsgi.multithread":		True,
+			"wsgi.multiprocess":	False,
+			"wsgi.run_once":		False,
+		}
+		if scope.get("client") is not None:
+			environ["REMOTE_ADDR"] = scope["client"][0]
+		for (name, value) in scope.get("headers", [ ]):
+			name = name.decode("latin-1").upper().replace("-", "_")
+			value = value.decode("latin-1")
+			if name == "CONTENT_LENGTH":
+				continue
+			if name != "CONTENT_TYPE":
+				name = "HTTP_" + name
+			if name in environ:
+				environ[name] += "," + value
+			else:
+				environ[name] = value
+		return environ
+
+	def _run_wsgi(self, loop, environ, send):
+		"""Runs in the thread pool. Responses of known length are buffered and
+		returned so they can be sent from the event loop; responses without
+		known length (i.e., streams) are sent chunk by chunk from here."""
+		response_start = { }
+		def start_response(status, headers, exc_info = None):
+			response_start["status"] = int(status.split(" ", maxsplit = 1)[0])
+			response_start["headers"] = [ (name.lower().encode("latin-1"), value.encode("latin-1")) for (name, value) in headers ]
+
+		def send_threadsafe(message):
+			asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+		result = self._wsgi_app(environ, start_response)
+		try:
+			if any(name == b"content-length" for (name, value) in response_start["headers"]):
+				return (response_start, b"".join(result))
+			send_threadsafe({ "type": "http.response.start", "status": response_start["status"], "headers": response_start["headers"] })
+			for chunk in result:
+				if len(chunk) > 0:
+					send_threadsafe({ "type": "http.response.body", "body": chunk, "more_body": True })
+			send_threadsafe({ "type": "http.response.body", "body": b"", "more_body": False })
+			return None
+		finally:
+			if hasattr(result, "close"):
+				result.close()
+
+	async def _serve_http(self, scope, receive, send):
+		body = await self._receive_body(receive)
+		if body is None:
+			return
+		environ = self._create_environ(scope, body)
+		# get_running_loop() would be preferable, but requires Python 3.7
+		loop = asyncio.get_event_loop()
+		buffered_response = await loop.run_in_executor(self._executor, self._run_wsgi, loop, environ, send)
+		if buffered_response is not None:
+			(response_start, response_body) = buffered_response
+			await send({ "type": "http.response.start", "status": response_start["status"], "headers": response_start["headers"] })
+			await send({ "type": "http.response.body", "body": response_body, "more_body": False })
@@ -21,7 +21,7 @@
 
 import json
 import uuid
-from pyengineer import LocalTemplateLookup
+from pyengineer.Exceptions import InputDataException
 
 class BasePlugin(object):
 	_ID = None
@@ -29,15 +29,28 @@ class BasePlugin(object):
 	_MENU_HIERARCHY = None
 	_FORM_TEMPLATE = None
 	_RESPONSE_TEMPLATE = None
+
+	# Set to True in derived classes whose response only depends on the
+	# request parameters (and the configuration) so that the responses may
+	# be cached.
+	_CACHEABLE = False
+
+	# Set to True in derived classes whose requests may take significant CPU
+	# time, so that they're executed in the request process pool (if there
+	# is one). _REQUEST_TIMEOUT overrides the pool's default time budget (in
+	# seconds) for one request.
+	_CPU_INTENSIVE = False
+	_REQUEST_TIMEOUT = None
 	__FORM_TEMPLATE_PREFIX = "<%namespace file=\"plugin_form_lib.html\" import=\"*\" />\n"
 	__RESPONSE_TEMPLATE_PREFIX = "<%namespace file=\"plugin_response_lib.html\" import=\"*\" />\n<%inherit file=\"plugin_response_base.html\" />\n"
 
-	def __init__(self, configuration, instanciated_from = None):
+	def __init__(self, configuration, instanciated_from = None, source_hash = None):
 		assert(isinstance(self._ID, str))
 		assert(isinstance(self._TITLE, str))
 		assert(isinstance(self._MENU_HIERARCHY, tuple))
 		self.__config = configuration
 		self.__instanciated_from = instanciated_from
+		self.__source_hash = source_hash
 		variables = {
 			"request_uri":	self.__request_uri,
 			"title":		self.plugin_title,
@@ -45,13 +58,13 @@ class BasePlugin(object):
 
 		# Render the request handler completely now
 		form_template = self.__FORM_TEMPLATE_PREFIX + self.form_template
-		self._rendered_form_html = LocalTemplateLookup().create(form_template).render(**variables)
+		self._rendered_form_html = configuration.template_lookup.create(form_template).render(**variables)
 
 		# But only prepare the response handler (so we can render it with
 		# actual responses later)
 		if self.response_template is not None:
 			response_template = self.__RESPONSE_TEMPLATE_PREFIX + self.response_template
-			self._response_template = LocalTemplateLookup().create(response_template)
+			self._response_template = configuration.template_lookup.create(response_template)
 		else:
 			self._response_template = None
 
@@ -68,6 +81,12 @@ class BasePlugin(object):
 	def instanciated_from(self):
 		return self.__instanciated_from
 
+	@property
+	def plugin_source_hash(self):
+		"""Hash of the source the plugin was loaded from (if known), so that
+		cached results of previous versions can be told apart."""
+		return self.__source_hash
+
 	@property
 	def plugin_id(self):
 		return uuid.UUID(self._ID)
@@ -80,6 +99,18 @@ class BasePlugin(object):
 	def plugin_menu_hierarchy(self):
 		return self._MENU_HIERARCHY
 
+	@property
+	def plugin_cacheable(self):
+		return self._CACHEABLE
+
+	@property
+	def plugin_cpu_intensive(self):
+		return self._CPU_INTENSIVE
+
+	@property
+	def plugin_request_timeout(self):
+		return self._REQUEST_TIMEOUT
+
 	@property
 	def form_template(self):
 		return self._FORM_TEMPLATE
@@ -92,6 +123,34 @@ class BasePlugin(object):
 	def config(self):
 		return self.__config
 
+	def request_batch(self, endpoint, parameters_list):
+		"""Handles a list of requests at once and returns a list of (success,
+		result) tuples, one for each request. For a failed request, result is
+		the exception it raised. Derived classes may override this to compute
+		the whole batch at once; by default, every request is handled
+		individually."""
+		results = [ ]
+		for parameters in parameters_list:
+			try:
+				results.append((True, self.request(endpoint, parameters)))
+			except (KeyError, ValueError, InputDataException) as e:
+				results.append((False, e))
+		return results
+
+	def request_stream(self, endpoint, parameters, limit = None):
+		"""Yields the results of a request one-by-one so they can be streamed
+		to the client. If a limit is given, only that many of the best
+		results are yielded. Derived classes which produce large result lists
+		should override this with a generator that never holds all results
+		in memory; by default, the (already sorted) list result of request()
+		is used."""
+		result = self.request(endpoint, parameters)
+		if not isinstance(result, list):
+			result = [ result ]
+		if limit is not None:
+			result = result[ : limit]
+		yield from result
+
 	def render_response(self, response):
 		if self._response_template is None:
 			return "No response renderer defined in derived class.\n"
@@ -0,0 +1,86 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import gzip
+import json
+import flask
+import hashlib
+
+class CachedResponse(object):
+	"""Response body which is encoded (and compressed) once and then served
+	over and over again. Clients can revalidate using the strong ETag and
+	get a 304 if they already have the current version."""
+	def __init__(self, data, mimetype, cache_control = "no-cache"):
+		assert(isinstance(data, bytes))
+		self._data = data
+		self._mimetype = mimetype
+		self._cache_control = cache_control
+		self._etag = hashlib.sha256(data).hexdigest()[:32]
+		gzip_data = gzip.compress(data, compresslevel = 9)
+		if len(gzip_data) < len(data):
+			self._gzip_data = gzip_data
+		else:
+			self._gzip_data = None
+
+	@classmethod
+	def from_json(cls, json_data, **kwargs):
+		return cls(json.dumps(json_data).encode("utf-8"), mimetype = "application/json", **kwargs)
+
+	@classmethod
+	def from_html(cls, html_data, **kwargs):
+		return cls(html_data.encode("utf-8"), mimetype = "text/html", **kwargs)
+
+	@property
+	def etag(self):
+		return self._etag
+
+	@property
+	def data(self):
+		return self._data
+
+	@property
+	def gzip_data(self):
+		return self._gzip_data
+
+	def _create_response(self, data, etag):
+		response = flask.Response(data, mimetype = self._mimetype)
+		response.set_etag(etag)
+		response.headers["Cache-Control"] = self._cache_control
+		response.headers["Vary"] = "Accept-Encoding"
+		return response
+
+	def serve(self, request):
+		# Compressed variant is a different representation and therefore
+		# needs its own strong ETag
+		use_gzip = (self._gzip_data is not None) and (request.accept_encodings["gzip"] > 0)
+		etag = (self._etag + "-gzip") if use_gzip else self._etag
+
+		if request.if_none_match.contains(etag):
+			response = self._create_response(b"", etag)
+			response.status_code = 304
+			return response
+
+		if use_gzip:
+			response = self._create_response(self._gzip_data, etag)
+			response.headers["Content-Encoding"] = "gzip"
+		else:
+			response = self._create_response(self._data, etag)
+		return response
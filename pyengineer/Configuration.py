@@ -19,32 +19,64 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
 import json
-import collections
+import hashlib
 import pkgutil
-from pyengineer import UnitValue, ThreadDB
+from pyengineer import ThreadDB
+from pyengineer.LocalTemplateLookup import LocalTemplateLookup
 from pyengineer.ValueSets import ValueSets
 
 class Configuration(object):
 	def __init__(self, json_filename):
-		with open(json_filename, "r") as f:
-			self._raw_config = json.loads(f.read())
+		self._json_filename = json_filename
+		with open(json_filename, "rb") as f:
+			raw_data = f.read()
+		self._raw_config = json.loads(raw_data.decode("utf-8"))
+		self._version = self._compute_version(raw_data)
 
+		# Everything else is only materialized when it's first needed so that
+		# workers start up quickly and never pay for what they don't use
 		self._valuesets = { }
-		for (group, valuesets_data) in self._raw_config["valuesets"].items():
-			self._valuesets[group] = ValueSets.from_dict(valuesets_data)
+		self._config_dict = None
+		self._thread_db = None
 
-		self._config_dict = self._create_dict()
+	@property
+	def base_directory(self):
+		"""Directory that relative filenames in the configuration refer to."""
+		return os.path.dirname(os.path.abspath(self._json_filename))
+
+	def _iter_catalog_filenames(self):
+		for valuesets_data in self._raw_config.get("valuesets", { }).values():
+			for valueset_data in valuesets_data:
+				if (valueset_data.get("type") == "catalog") and ("filename" in valueset_data):
+					yield os.path.join(self.base_directory, valueset_data["filename"])
 
-		self._thread_db = ThreadDB()
-		database_data = json.loads(pkgutil.get_data("pyengineer.data", "threads.json").decode("utf-8"))
-		self._thread_db.add_groups_by_definition(database_data)
+	def _compute_version(self, raw_data):
+		# Catalogs are external files which may be updated independently of
+		# the configuration; stat()ing them is cheap enough for startup
+		version_hash = hashlib.sha256(raw_data)
+		for filename in self._iter_catalog_filenames():
+			try:
+				stat = os.stat(filename)
+				state = "%d:%d" % (stat.st_mtime_ns, stat.st_size)
+			except OSError:
+				state = "missing"
+			version_hash.update(("\0%s\0%s" % (filename, state)).encode("utf-8"))
+		return version_hash.hexdigest()[:16]
 
 	@property
 	def thread_db(self):
+		if self._thread_db is None:
+			thread_db = ThreadDB()
+			database_data = json.loads(pkgutil.get_data("pyengineer.data", "threads.json").decode("utf-8"))
+			thread_db.add_groups_by_definition(database_data)
+			self._thread_db = thread_db
 		return self._thread_db
 
 	def to_dict(self):
+		if self._config_dict is None:
+			self._config_dict = self._create_dict()
 		return self._config_dict
 
 	def _create_dict(self):
@@ -57,18 +89,61 @@ class Configuration(object):
 			"c":			lambda value: value.format(significant_digits = 3),
 			"l":			lambda value: value.format(significant_digits = 3),
 		}
-		for (group, valuesets) in self._valuesets.items():
+		for group in self._raw_config["valuesets"]:
 			data["valuesets"][group] = [ ]
-			for valueset in valuesets:
+			for valueset in self.get_valuesets(group):
 				data["valuesets"][group].append(valueset.to_dict(repr_callback = repr_callbacks.get(group)))
 		return data
 
 	def get_valuesets(self, group):
 		if group not in self._valuesets:
-			raise KeyError("No such ValueSet: %s" % (group))
+			if group not in self._raw_config["valuesets"]:
+				raise KeyError("No such ValueSet: %s" % (group))
+			self._valuesets[group] = ValueSets.from_dict(self._raw_config["valuesets"][group], base_directory = self.base_directory)
 		return self._valuesets[group]
 
+	@property
+	def version(self):
+		"""Hash of the configuration file contents and the state of all
+		catalog files it references."""
+		return self._version
+
+	@property
+	def filename(self):
+		return self._json_filename
+
+	@property
+	def request_pool(self):
+		"""Options for the process pool which executes CPU intensive plugin
+		requests or None if requests should be handled in-process."""
+		return self._raw_config.get("request_pool")
+
+	@property
+	def plugin_reload_interval(self):
+		"""Interval in seconds in which the plugin directory is polled for
+		changed plugins or None if plugins should not be reloaded."""
+		return self._raw_config.get("plugin_reload_interval")
+
+	@property
+	def shared_cache(self):
+		"""Options for the cross-process response cache or None if there is
+		no such cache configured."""
+		return self._raw_config.get("shared_cache")
+
+	@property
+	def template_cache(self):
+		"""Options for the on-disk cache of compiled templates or None if
+		templates should only be compiled in memory."""
+		return self._raw_config.get("template_cache")
+
+	@property
+	def template_lookup(self):
+		template_cache = self.template_cache
+		if template_cache is None:
+			return LocalTemplateLookup.shared()
+		directory = os.path.join(self.base_directory, template_cache["directory"])
+		return LocalTemplateLookup.shared(module_directory = directory, max_age = template_cache.get("max_age", 30 * 86400))
+
 	@property
 	def plugin_directory(self):
-		# TODO: Hardcoded for now
-		return "plugins"
+		return self._raw_config.get("plugin_directory", "plugins")
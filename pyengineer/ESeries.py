@@ -20,6 +20,7 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 
+import math
 import bisect
 import collections
 import fractions
@@ -64,43 +65,96 @@ class ESeries(object):
 				866, 876, 887, 898, 909, 920, 931, 942, 953, 965, 976, 988),
 	}
 
-	def __init__(self, values):
+	# Nominal EIA/IEC 60063 tolerance of each standard series
+	_STANDARD_TOLERANCES = {
+		3:		fractions.Fraction(40, 100),
+		6:		fractions.Fraction(20, 100),
+		12:		fractions.Fraction(10, 100),
+		24:		fractions.Fraction(5, 100),
+		48:		fractions.Fraction(2, 100),
+		96:		fractions.Fraction(1, 100),
+		192:	fractions.Fraction(5, 1000),
+	}
+
+	# Decades (as powers of ten) which are precomputed, i.e., 1f to 1T
+	_TABLE_EXPONENTS = (-15, 12)
+	_STANDARD_INSTANCES = { }
+
+	# Relative distance to a table entry below which the float lookup is
+	# considered ambiguous and we decide using exact arithmetic instead.
+	_EXACT_TIEBREAK_EPSILON = 1e-9
+
+	def __init__(self, values, tolerance = None):
 		assert(all(isinstance(value, int) for value in values))
 		assert(all(value >= 100 for value in values))
 		assert(all(value < 1000 for value in values))
 		self._values = tuple(sorted(fractions.Fraction(numerator, 100) for numerator in values))
+		self._float_values = tuple(float(value) for value in self._values)
+		self._tolerance = tolerance
+		self._table = None
+		self._table_offset = self._TABLE_EXPONENTS[0] * len(self._values)
 
 	@property
 	def values(self):
 		return self._values
 
+	@property
+	def tolerance(self):
+		return self._tolerance
+
+	@staticmethod
+	def _scale_up(value, exponent):
+		if exponent >= 0:
+			return value * (10 ** exponent)
+		else:
+			return value / (10 ** -exponent)
+
 	@classmethod
 	def _decompose_value(cls, value):
-		exponent = 0
-		base = fractions.Fraction(value)
-		while base < 1:
-			base *= 10
+		value = float(value)
+		exponent = math.floor(math.log10(value))
+		base = cls._scale_up(value, -exponent)
+		# log10 can be off by one right at a decade boundary
+		if base < 1:
 			exponent -= 1
-		while base >= 10:
-			base /= 10
+			base = cls._scale_up(value, -exponent)
+		elif base >= 10:
 			exponent += 1
+			base = cls._scale_up(value, -exponent)
 		decomposed = cls._DecomposedValue(base = base, exponent = exponent)
 		return decomposed
 
+	def _is_ambiguous(self, base, rel_index):
+		lower = self._float_values[rel_index] if (rel_index >= 0) else 1
+		upper = self._float_values[rel_index + 1] if (rel_index + 1 < len(self._float_values)) else 10
+		return ((base - lower) < (lower * self._EXACT_TIEBREAK_EPSILON)) or ((upper - base) < (upper * self._EXACT_TIEBREAK_EPSILON))
+
 	def _find_index(self, value):
 		decomposed_value = self._decompose_value(value)
-		rel_index = bisect.bisect(self._values, decomposed_value.base) - 1
+		rel_index = bisect.bisect(self._float_values, decomposed_value.base) - 1
 		abs_index = (decomposed_value.exponent * len(self._values)) + rel_index
+		if self._is_ambiguous(decomposed_value.base, rel_index):
+			# Float rounding might have put us on the wrong side of a series
+			# value, settle this exactly.
+			exact_value = fractions.Fraction(value)
+			while self._absindex_to_value(abs_index) > exact_value:
+				abs_index -= 1
+			while self._absindex_to_value(abs_index + 1) <= exact_value:
+				abs_index += 1
 		return abs_index
 
+	def _create_table(self):
+		(min_exponent, max_exponent) = self._TABLE_EXPONENTS
+		return tuple(self._scale_up(base, exponent) for exponent in range(min_exponent, max_exponent + 1) for base in self._values)
+
 	def _absindex_to_value(self, abs_index):
+		if self._table is None:
+			self._table = self._create_table()
+		table_index = abs_index - self._table_offset
+		if 0 <= table_index < len(self._table):
+			return self._table[table_index]
 		(exponent, rel_index) = divmod(abs_index, len(self._values))
-		base = self._values[rel_index]
-		if exponent >= 0:
-			value = base * (10 ** exponent)
-		else:
-			value = base / (10 ** -exponent)
-		return value
+		return self._scale_up(self._values[rel_index], exponent)
 
 	def _absindex_to_match(self, abs_index, ideal_value):
 		found_value = self._absindex_to_value(abs_index)
@@ -113,8 +167,18 @@ class ESeries(object):
 		larger = self._absindex_to_match(smaller_index + 1, value)
 		return self._ESeriesMatches(smaller = smaller, larger = larger)
 
+	def smaller_larger_many(self, values):
+		return [ self.smaller_larger(value) for value in values ]
+
 	def closest(self, value):
 		matches = self.smaller_larger(value)
+		return self._closer_match(matches)
+
+	def closest_many(self, values):
+		return [ self._closer_match(matches) for matches in self.smaller_larger_many(values) ]
+
+	@staticmethod
+	def _closer_match(matches):
 		if abs(matches.smaller.error) < abs(matches.larger.error):
 			return matches.smaller
 		else:
@@ -130,8 +194,28 @@ class ESeries(object):
 			if (not maxvalue_inclusive) and (min_value <= value < max_value):
 				yield value
 
+	def covering(self, value, tolerance = None):
+		"""Returns all matches whose tolerance band covers the given value,
+		i.e., nominal * (1 - tolerance) <= value <= nominal * (1 + tolerance).
+		If no tolerance is given, the nominal one of the series is used."""
+		if tolerance is None:
+			tolerance = self.tolerance
+		if tolerance is None:
+			raise Exception("No tolerance given and series has no nominal tolerance.")
+		tolerance = fractions.Fraction(tolerance)
+		assert(0 <= tolerance < 1)
+		exact_value = fractions.Fraction(value)
+		min_nominal = exact_value / (1 + tolerance)
+		max_nominal = exact_value / (1 - tolerance)
+		return [ self._ESeriesMatch(value = nominal, error = (nominal - value) / value) for nominal in self.from_to(min_nominal, max_nominal, maxvalue_inclusive = True) ]
+
+	def covering_many(self, values, tolerance = None):
+		return [ self.covering(value, tolerance = tolerance) for value in values ]
+
 	@classmethod
 	def standard(cls, key):
 		if key not in cls._STANDARD_SERIES:
 			raise Exception("Not a known standard series.")
-		return cls(cls._STANDARD_SERIES[key])
+		if key not in cls._STANDARD_INSTANCES:
+			cls._STANDARD_INSTANCES[key] = cls(cls._STANDARD_SERIES[key], tolerance = cls._STANDARD_TOLERANCES[key])
+		return cls._STANDARD_INSTANCES[key]
@@ -23,7 +23,12 @@ class GeneralException(Exception): pass
 
 class InvalidThreadDefinitionException(GeneralException): pass
 class InputDataException(GeneralException): pass
+class RequestAbortedException(GeneralException): pass
+class RequestTimeoutException(RequestAbortedException): pass
+class WorkerCrashedException(RequestAbortedException): pass
+class PluginLoadException(GeneralException): pass
 
 class DuplicateEntryException(GeneralException): pass
 class DataMissingException(GeneralException): pass
 class InvalidDataException(GeneralException): pass
+class CircularReferenceException(GeneralException): pass
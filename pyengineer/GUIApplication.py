@@ -19,41 +19,119 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
-import os
+import json
+import time
 import flask
+import threading
 import traceback
-import importlib.machinery
-from mako.lookup import TemplateLookup
-from .Exceptions import InputDataException, DuplicateEntryException
+from .Exceptions import InputDataException, DuplicateEntryException, RequestAbortedException
 from .MenuHierarchy import MenuHierarchy
+from .CachedResponse import CachedResponse
+from .LRUCache import LRUCache
+from .SharedCache import SharedCache
+from .PluginLoader import PluginLoader
+from .PluginWatcher import PluginWatcher
+from .PluginProcessPool import PluginProcessPool
 
 class GUIApplication(object):
-	def __init__(self, config):
+	def __init__(self, config, response_cache_size = 1024, response_cache_bytes = 64 * 1024 * 1024, max_cached_response_bytes = 1024 * 1024, request_pool = None):
 		self._menu = MenuHierarchy()
 		self._config = config
-		template_dir = os.path.dirname(__file__) + "/templates"
-		self._lookup = TemplateLookup([ template_dir ], input_encoding = "utf-8", strict_undefined = True)
+		if (request_pool is None) and (self._config.request_pool is not None):
+			request_pool_options = self._config.request_pool
+			request_pool = PluginProcessPool(self._config.filename, max_workers = request_pool_options.get("workers"), timeout = request_pool_options.get("timeout", 10), max_batch_timeout = request_pool_options.get("max_batch_timeout", 60), startup_timeout = request_pool_options.get("startup_timeout", 60))
+		self._request_pool = request_pool
+		self._config_response = None
+		self._response_cache = LRUCache(maxsize = response_cache_size, max_total_size = response_cache_bytes, max_entry_size = max_cached_response_bytes, sizeof = lambda response: len(response.encode("utf-8")))
+		if self._config.shared_cache is not None:
+			shared_cache_options = self._config.shared_cache
+			self._shared_cache = SharedCache(shared_cache_options["filename"], ttl = shared_cache_options.get("ttl", 3600), max_entries = shared_cache_options.get("max_entries", 10000))
+		else:
+			self._shared_cache = None
+		self._lookup = self._config.template_lookup
 		self._app = flask.Flask(__name__)
 		self._app.add_url_rule("/", "index", self._serve_index)
 		self._app.add_url_rule("/config", "config", self._serve_config)
 		self._app.add_url_rule("/plugins/<uuid:plugin_uuid>", "plugin_index", self._serve_plugin_index)
 		self._app.add_url_rule("/plugins/<uuid:plugin_uuid>/<endpoint>", "plugin_request", self._serve_plugin_request, methods = [ "POST" ])
-		self._load_plugins(self._config.plugin_directory)
+		self._app.add_url_rule("/plugins/<uuid:plugin_uuid>/<endpoint>/batch", "plugin_batch_request", self._serve_plugin_batch_request, methods = [ "POST" ])
+		self._reload_lock = threading.Lock()
+		self._load_plugins()
 		self._menu.sort()
+		self._pages = self._render_pages()
+		if self._config.plugin_reload_interval is not None:
+			self.watch_plugins(self._config.plugin_reload_interval)
+
+	def _load_plugins(self):
+		for instance in PluginLoader(self._config).load_plugins_lazily():
+			self._menu.register(instance.plugin_id, instance.plugin_menu_hierarchy, instance)
+
+	def reload_plugins(self, filenames):
+		"""Reloads the plugins of the given (added, modified or removed)
+		files, swaps in a menu containing the new versions and invalidates
+		everything that was cached for them."""
+		loader = PluginLoader(self._config)
+		with self._reload_lock:
+			old_plugins = { instance.instanciated_from: instance for (plugin_id, instance) in self._menu.items() }
+			new_plugins = loader.reload_plugins(old_plugins, filenames)
+
+			# Build a new menu instead of modifying the one in use, so that
+			# concurrent requests see either the old or the new version
+			menu = MenuHierarchy()
+			try:
+				for instance in new_plugins.values():
+					menu.register(instance.plugin_id, instance.plugin_menu_hierarchy, instance)
+			except DuplicateEntryException:
+				print("Reloading plugins failed, keeping previous versions.")
+				print(traceback.format_exc())
+				return
+			menu.sort()
+			self._menu = menu
+			self.invalidate_pages()
+
+			changed_plugin_ids = set()
+			for filename in filenames:
+				for plugins in (old_plugins, new_plugins):
+					if filename in plugins:
+						changed_plugin_ids.add(plugins[filename].plugin_id)
+			for plugin_id in changed_plugin_ids:
+				self._discard_cached_responses(plugin_id)
+
+	def watch_plugins(self, interval = 1):
+		"""Starts a background thread which polls the plugin directory and
+		reloads plugins as soon as they change."""
+		watcher = PluginWatcher(PluginLoader(self._config))
+		def watch():
+			while True:
+				time.sleep(interval)
+				try:
+					changed = watcher.poll()
+					if len(changed) > 0:
+						self.reload_plugins(changed)
+				except Exception:
+					# Keep watching, the next poll may well succeed
+					print("Polling for changed plugins failed.")
+					print(traceback.format_exc())
+		thread = threading.Thread(target = watch, daemon = True)
+		thread.start()
+
+	def _execute_request(self, instance, endpoint, input_data):
+		if (self._request_pool is None) or (not instance.plugin_cpu_intensive):
+			return instance.request(endpoint, input_data)
+		else:
+			return self._request_pool.request(instance, endpoint, input_data)
 
-	def _load_plugin(self, python_filename):
-		module = importlib.machinery.SourceFileLoader("plugin_module", python_filename).load_module()
-		plugin_class = module.Plugin
-		instance = plugin_class(self._config, instanciated_from = python_filename)
-		instance_uuid = instance.plugin_id
-		self._menu.register(instance_uuid, instance.plugin_menu_hierarchy, instance)
+	def _execute_request_batch(self, instance, endpoint, input_data):
+		if (self._request_pool is None) or (not instance.plugin_cpu_intensive):
+			return instance.request_batch(endpoint, input_data)
+		else:
+			return self._request_pool.request_batch(instance, endpoint, input_data)
 
-	def _load_plugins(self, plugin_directory):
-		if not plugin_directory.endswith("/"):
-			plugin_directory += "/"
-		for filename in filter(lambda name: name.endswith(".py"), os.listdir(plugin_directory)):
-			full_filename = plugin_directory + filename
-			self._load_plugin(full_filename)
+	def _execute_request_stream(self, instance, endpoint, input_data, limit):
+		if (self._request_pool is None) or (not instance.plugin_cpu_intensive):
+			return instance.request_stream(endpoint, input_data, limit = limit)
+		else:
+			return self._request_pool.request_stream(instance, endpoint, input_data, limit = limit)
 
 	def _serve(self, template_name, variables = None):
 		template = self._lookup.get_template(template_name)
@@ -66,62 +144,246 @@ class GUIApplication(object):
 		result = template.render(**render_variables)
 		return result
 
-	def _serve_index(self):
-		return self._serve("index.html")
+	def _render_pages(self):
+		"""The index and plugin pages only depend on the loaded plugins (and
+		the menu they span), so they're rendered once and served from
+		memory. The index page (key None) is rendered right away, plugin
+		pages when they're first requested so that plugins are only
+		imported when needed."""
+		return { None: CachedResponse.from_html(self._serve("index.html")) }
 
-	def _serve_plugin_index(self, plugin_uuid):
-		instance = self._menu[plugin_uuid]
+	def _render_plugin_page(self, instance):
 		variables = {
 			"title":				instance.plugin_title,
 			"rendered_form_html":	instance.rendered_form_html,
 		}
-		return self._serve("plugin.html", variables)
+		return CachedResponse.from_html(self._serve("plugin.html", variables))
+
+	def invalidate_pages(self):
+		"""Discards all rendered pages; to be called whenever plugins change."""
+		self._pages = self._render_pages()
+
+	def _serve_index(self):
+		return self._pages[None].serve(flask.request)
+
+	def _serve_plugin_index(self, plugin_uuid):
+		pages = self._pages
+		if plugin_uuid not in pages:
+			pages[plugin_uuid] = self._render_plugin_page(self._menu[plugin_uuid])
+		return pages[plugin_uuid].serve(flask.request)
 
 	def _serve_plugin_request(self, plugin_uuid, endpoint):
 		instance = self._menu[plugin_uuid]
 		if "Accept" not in flask.request.headers:
-			return flask.jsonify({
+			return self._create_response(self._render_json({
 				"status":		"failed",
 				"errorcode":	"NoAcceptHeader",
 				"description":	"No 'Accept' header set.",
-			})
+			}), "application/json")
 
-		accepts = flask.request.accept_mimetypes.best_match([ "application/json", "text/html" ])
+		accepts = flask.request.accept_mimetypes.best_match([ "application/json", "text/html", "application/x-ndjson" ])
 		if accepts == "application/json":
-			renderer = flask.jsonify
+			renderer = self._render_json
 		elif accepts == "text/html":
 			renderer = instance.render_response
+		elif accepts == "application/x-ndjson":
+			return self._serve_plugin_stream(instance, endpoint)
 		else:
-			return flask.jsonify({
+			return self._create_response(self._render_json({
 				"status":		"failed",
 				"errorcode":	"UnknownAcceptHeader",
-				"description":	"'Accept' header must be either application/json or text/html, but was '%s'." % (flask.request.headers["Accept"]),
-			})
+				"description":	"'Accept' header must be either application/json, text/html or application/x-ndjson, but was '%s'." % (flask.request.headers["Accept"]),
+			}), "application/json")
 
 		input_data = flask.request.json
 		if input_data is None:
-			return renderer({
+			return self._create_response(renderer({
 				"status":		"failed",
 				"errorcode":	"JSONInputWasNone",
 				"description":	"No JSON input provided.",
-			})
+			}), accepts)
+
+		if instance.plugin_cacheable:
+			cache_key = self._cache_key(instance.plugin_id, self._plugin_version(instance), endpoint, input_data, accepts)
+			cached_response = self._get_cached_response(cache_key)
+			if cached_response is not None:
+				return self._create_response(cached_response, accepts)
+
 		try:
-			result = instance.request(endpoint, flask.request.json)
-		except (KeyError, ValueError, InputDataException) as e:
+			result = self._execute_request(instance, endpoint, input_data)
+		except (KeyError, ValueError, InputDataException, RequestAbortedException) as e:
 			print(traceback.format_exc())
-			return renderer({
+			return self._create_response(renderer({
 				"status":		"exception",
 				"errorcode":	e.__class__.__name__,
 				"description":	str(e),
-			})
+			}), accepts)
 
-		return renderer({
+		response = renderer({
 			"status":		"ok",
 			"data":			result,
 		})
+		if instance.plugin_cacheable:
+			self._put_cached_response(cache_key, response)
+		return self._create_response(response, accepts)
+
+	def _plugin_version(self, instance):
+		# Responses cached by a previous plugin version or for a different
+		# configuration (e.g., in the shared cache, which survives restarts)
+		# must never be served, nor may a request still running on a
+		# replaced plugin pollute the entries of its successor
+		return "%s:%s" % (self._config.version, instance.plugin_source_hash)
+
+	@staticmethod
+	def _cache_key(plugin_id, version, endpoint, input_data, accepts):
+		return json.dumps([ str(plugin_id), version, endpoint, input_data, accepts ], sort_keys = True, separators = (",", ":"))
+
+	def _discard_cached_responses(self, plugin_id):
+		# All keys of a plugin start with the plugin ID as first list element
+		prefix = json.dumps([ str(plugin_id) ])[: -1] + ","
+		self._response_cache.discard_prefix(prefix)
+		if self._shared_cache is not None:
+			self._shared_cache.discard_prefix(prefix)
+
+	def _get_cached_response(self, cache_key):
+		response = self._response_cache.get(cache_key)
+		if (response is None) and (self._shared_cache is not None):
+			response = self._shared_cache.get(cache_key)
+			if response is not None:
+				self._response_cache.put(cache_key, response)
+		return response
+
+	def _put_cached_response(self, cache_key, response):
+		self._response_cache.put(cache_key, response)
+		if self._shared_cache is not None:
+			self._shared_cache.put(cache_key, response)
+
+	def _serve_plugin_stream(self, instance, endpoint):
+		def render_line(data):
+			return json.dumps(data) + "\n"
+
+		def render_stream(first_result, results):
+			yield render_line({
+				"status":		"ok",
+				"data":			first_result,
+			})
+			try:
+				for result in results:
+					yield render_line({
+						"status":		"ok",
+						"data":			result,
+					})
+			except (KeyError, ValueError, InputDataException, RequestAbortedException) as e:
+				print(traceback.format_exc())
+				yield render_line({
+					"status":		"exception",
+					"errorcode":	e.__class__.__name__,
+					"description":	str(e),
+				})
+
+		input_data = flask.request.json
+		if input_data is None:
+			return self._create_response(render_line({
+				"status":		"failed",
+				"errorcode":	"JSONInputWasNone",
+				"description":	"No JSON input provided.",
+			}), "application/x-ndjson")
+
+		limit = flask.request.args.get("limit")
+		if limit is not None:
+			try:
+				limit = int(limit)
+			except ValueError:
+				limit = 0
+			if limit < 1:
+				return self._create_response(render_line({
+					"status":		"failed",
+					"errorcode":	"InvalidLimit",
+					"description":	"'limit' must be a positive integer, but was '%s'." % (flask.request.args["limit"]),
+				}), "application/x-ndjson")
+
+		try:
+			# Fetch the first result before starting the response so that
+			# invalid input is reported like for all other requests
+			results = iter(self._execute_request_stream(instance, endpoint, input_data, limit))
+			first_result = next(results)
+		except StopIteration:
+			return self._create_response("", "application/x-ndjson")
+		except (KeyError, ValueError, InputDataException, RequestAbortedException) as e:
+			print(traceback.format_exc())
+			return self._create_response(render_line({
+				"status":		"exception",
+				"errorcode":	e.__class__.__name__,
+				"description":	str(e),
+			}), "application/x-ndjson")
+		return flask.Response(flask.stream_with_context(render_stream(first_result, results)), mimetype = "application/x-ndjson")
+
+	def _serve_plugin_batch_request(self, plugin_uuid, endpoint):
+		instance = self._menu[plugin_uuid]
+		input_data = flask.request.json
+		if (not isinstance(input_data, list)) or (not all(isinstance(parameters, dict) for parameters in input_data)):
+			return self._create_response(self._render_json({
+				"status":		"failed",
+				"errorcode":	"JSONInputNotAList",
+				"description":	"Batch input must be a JSON array of parameter objects.",
+			}), "application/json")
+
+		try:
+			outcomes = self._execute_request_batch(instance, endpoint, input_data)
+		except RequestAbortedException as e:
+			outcomes = [ (False, e) for parameters in input_data ]
+
+		results = [ ]
+		for (success, result) in outcomes:
+			if success:
+				results.append({
+					"status":		"ok",
+					"data":			result,
+				})
+			else:
+				results.append({
+					"status":		"exception",
+					"errorcode":	result.__class__.__name__,
+					"description":	str(result),
+				})
+
+		return self._create_response(self._render_json({
+			"status":		"ok",
+			"data":			results,
+		}), "application/json")
+
+	@staticmethod
+	def _render_json(data):
+		return json.dumps(data)
+
+	@staticmethod
+	def _create_response(body, mimetype):
+		return flask.Response(body, mimetype = mimetype)
 
 	def _serve_config(self):
-		return flask.jsonify(self._config.to_dict())
+		# Built on first request rather than at startup: serializing the
+		# configuration materializes every value set, which the lazily
+		# loaded Configuration avoids for workers that never serve /config.
+		# Once built, the gzip body and ETag are never recomputed.
+		if self._config_response is None:
+			self._config_response = CachedResponse.from_json(self._config.to_dict())
+		return self._config_response.serve(flask.request)
+
+	@property
+	def response_cache(self):
+		return self._response_cache
+
+	@property
+	def shared_cache(self):
+		return self._shared_cache
+
+	@property
+	def request_pool(self):
+		return self._request_pool
+
+	@property
+	def menu(self):
+		return self._menu
 
 	@property
 	def app(self):
@@ -0,0 +1,125 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import threading
+import collections
+
+class LRUCache(object):
+	"""Size-bounded, thread-safe cache that evicts the least recently used
+	entry and counts hits and misses. Optionally, the total size of all
+	values (as determined by the sizeof function) is bounded as well and
+	values which exceed max_entry_size are never cached at all."""
+	def __init__(self, maxsize, max_total_size = None, max_entry_size = None, sizeof = len):
+		assert(maxsize >= 1)
+		self._maxsize = maxsize
+		self._max_total_size = max_total_size
+		self._max_entry_size = max_entry_size
+		self._sizeof = sizeof
+		self._entries = collections.OrderedDict()
+		self._total_size = 0
+		self._lock = threading.Lock()
+		self._hits = 0
+		self._misses = 0
+
+	@property
+	def maxsize(self):
+		return self._maxsize
+
+	@property
+	def max_total_size(self):
+		return self._max_total_size
+
+	@property
+	def total_size(self):
+		return self._total_size
+
+	@property
+	def hits(self):
+		return self._hits
+
+	@property
+	def misses(self):
+		return self._misses
+
+	def get(self, key, default = None):
+		with self._lock:
+			if key in self._entries:
+				self._hits += 1
+				self._entries.move_to_end(key)
+				return self._entries[key][0]
+			else:
+				self._misses += 1
+				return default
+
+	def put(self, key, value):
+		"""Returns True if the value was cached, False if it was rejected
+		because of its size."""
+		if (self._max_total_size is None) and (self._max_entry_size is None):
+			size = 0
+		else:
+			size = self._sizeof(value)
+		if (self._max_entry_size is not None) and (size > self._max_entry_size):
+			return False
+		if (self._max_total_size is not None) and (size > self._max_total_size):
+			return False
+		with self._lock:
+			if key in self._entries:
+				self._remove(key)
+			self._entries[key] = (value, size)
+			self._total_size += size
+			while len(self._entries) > self._maxsize:
+				self._remove(next(iter(self._entries)))
+			if self._max_total_size is not None:
+				while self._total_size > self._max_total_size:
+					self._remove(next(iter(self._entries)))
+		return True
+
+	def _remove(self, key):
+		(value, size) = self._entries.pop(key)
+		self._total_size -= size
+
+	def discard_prefix(self, prefix):
+		"""Removes all entries whose key starts with the given prefix."""
+		with self._lock:
+			for key in [ key for key in self._entries if key.startswith(prefix) ]:
+				self._remove(key)
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self._total_size = 0
+
+	def to_dict(self):
+		return {
+			"size":				len(self),
+			"maxsize":			self.maxsize,
+			"total_size":		self.total_size,
+			"max_total_size":	self.max_total_size,
+			"hits":				self.hits,
+			"misses":			self.misses,
+		}
+
+	def __contains__(self, key):
+		with self._lock:
+			return key in self._entries
+
+	def __len__(self):
+		return len(self._entries)
@@ -0,0 +1,82 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import threading
+from .Exceptions import PluginLoadException
+
+class LazyPlugin(object):
+	"""Stands in for a plugin whose ID, title and menu position are known
+	from its manifest. The plugin is only imported and instanciated (which
+	includes compiling its templates) when anything else is accessed.
+	Syntax errors are already found when the manifest is read, but errors
+	that only occur on import (e.g., a missing module) surface on first use
+	as a PluginLoadException; loading is retried on every access until it
+	succeeds."""
+	def __init__(self, loader, manifest):
+		self._loader = loader
+		self._manifest = manifest
+		self._instance = None
+		self._lock = threading.Lock()
+
+	@property
+	def plugin_id(self):
+		return self._manifest.plugin_id
+
+	@property
+	def plugin_title(self):
+		return self._manifest.title
+
+	@property
+	def plugin_menu_hierarchy(self):
+		return self._manifest.menu_hierarchy
+
+	@property
+	def plugin_source_hash(self):
+		return self._manifest.source_hash
+
+	@property
+	def instanciated_from(self):
+		return self._manifest.filename
+
+	@property
+	def loaded(self):
+		return self._instance is not None
+
+	@property
+	def instance(self):
+		with self._lock:
+			if self._instance is None:
+				try:
+					instance = self._loader.load_plugin(self._manifest.filename)
+				except Exception as e:
+					raise PluginLoadException("Plugin %s could not be loaded from %s: %s: %s" % (self.plugin_title, self._manifest.filename, e.__class__.__name__, str(e))) from e
+				if instance.plugin_id != self.plugin_id:
+					raise PluginLoadException("Plugin loaded from %s has ID %s, but its manifest says %s." % (self._manifest.filename, instance.plugin_id, self.plugin_id))
+				self._instance = instance
+			return self._instance
+
+	def __getattr__(self, name):
+		if name.startswith("_"):
+			raise AttributeError(name)
+		return getattr(self.instance, name)
+
+	def __str__(self):
+		return "LazyPlugin<%s / %s from %s>" % (self.plugin_title, self.plugin_id, self.instanciated_from)
@@ -20,17 +20,118 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 import os
+import time
+import hashlib
+import tempfile
+import threading
 from mako.template import Template
 from mako.lookup import TemplateLookup
 
 class LocalTemplateLookup(object):
-	def __init__(self):
+	"""Looks up templates from the "templates" directory and creates
+	templates from source strings. If a module directory is given, compiled
+	templates are cached on disk there so that they can be reused across
+	restarts and between processes; templates created from source strings
+	are keyed by the hash of their source. Cached templates that have not
+	been used for max_age seconds are removed."""
+	_SHARED_INSTANCES = { }
+	_SHARED_INSTANCES_LOCK = threading.Lock()
+
+	def __init__(self, module_directory = None, max_age = 30 * 86400):
 		template_dir = os.path.dirname(__file__) + "/templates"
-		self._lookup = TemplateLookup([ template_dir ], input_encoding = "utf-8", strict_undefined = True)
+		if module_directory is not None:
+			try:
+				os.makedirs(module_directory + "/source", exist_ok = True)
+			except OSError:
+				# Not writable, compile templates in memory
+				module_directory = None
+		self._module_directory = module_directory
+		self._lookup = TemplateLookup([ template_dir ], input_encoding = "utf-8", strict_undefined = True, module_directory = module_directory)
+		self._created = { }
+		self._lock = threading.Lock()
+		if (module_directory is not None) and (max_age is not None):
+			self.prune(max_age)
+
+	@classmethod
+	def shared(cls, module_directory = None, max_age = 30 * 86400):
+		"""Returns the lookup instance for the given module directory which
+		is shared by all plugins and the GUI."""
+		with cls._SHARED_INSTANCES_LOCK:
+			if module_directory not in cls._SHARED_INSTANCES:
+				cls._SHARED_INSTANCES[module_directory] = cls(module_directory = module_directory, max_age = max_age)
+			return cls._SHARED_INSTANCES[module_directory]
+
+	@property
+	def module_directory(self):
+		return self._module_directory
 
 	def get_template(self, template_name):
 		return self._lookup.get_template(template_name)
 
-	def create(self, template_source):
-		template = Template(template_source, strict_undefined = True, lookup = self._lookup)
+	@staticmethod
+	def _mtime(filename):
+		try:
+			return os.stat(filename).st_mtime
+		except FileNotFoundError:
+			return None
+
+	def prune(self, max_age):
+		"""Removes cached templates which were last used more than max_age
+		seconds ago (i.e., whose source and compiled module are both older
+		than that), orphaned compiled modules and leftover temporary
+		files."""
+		source_directory = self._module_directory + "/source/"
+		threshold = time.time() - max_age
+		for filename in os.listdir(source_directory):
+			full_filename = source_directory + filename
+			if filename.endswith(".html.py"):
+				stale = not os.path.exists(full_filename[ : -3])
+			elif filename.endswith(".html"):
+				mtimes = [ self._mtime(full_filename), self._mtime(full_filename + ".py") ]
+				stale = all((mtime is None) or (mtime < threshold) for mtime in mtimes)
+			else:
+				mtime = self._mtime(full_filename)
+				stale = (mtime is not None) and (mtime < threshold)
+			if not stale:
+				continue
+			for stale_filename in ([ full_filename, full_filename + ".py" ] if filename.endswith(".html") else [ full_filename ]):
+				try:
+					os.unlink(stale_filename)
+				except FileNotFoundError:
+					# Removed by a concurrently pruning process
+					pass
+
+	def _write_source(self, filename, template_source):
+		if os.path.exists(filename):
+			return
+		(fd, tmpname) = tempfile.mkstemp(dir = os.path.dirname(filename))
+		with os.fdopen(fd, "w", encoding = "utf-8") as f:
+			f.write(template_source)
+		os.replace(tmpname, filename)
+
+	def _compile(self, template_source):
+		if self._module_directory is None:
+			return Template(template_source, strict_undefined = True, lookup = self._lookup)
+
+		# The source file is named by its hash and therefore never changes
+		# once written; Mako takes care of (re-)compiling the module next
+		# to it when it is missing or older than the source.
+		digest = hashlib.sha256(template_source.encode("utf-8")).hexdigest()
+		source_filename = self._module_directory + "/source/" + digest + ".html"
+		module_filename = source_filename + ".py"
+		self._write_source(source_filename, template_source)
+		template = Template(filename = source_filename, uri = "/" + digest + ".html", module_filename = module_filename, input_encoding = "utf-8", strict_undefined = True, lookup = self._lookup)
+
+		# Usage is recorded on the compiled module: moving it forward keeps
+		# it valid, while touching the source would force a recompile
+		try:
+			os.utime(module_filename)
+		except FileNotFoundError:
+			pass
 		return template
+
+	def create(self, template_source):
+		with self._lock:
+			if template_source not in self._created:
+				self._created[template_source] = self._compile(template_source)
+			return self._created[template_source]
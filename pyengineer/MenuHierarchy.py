@@ -168,6 +168,9 @@ class MenuHierarchy(object):
 	def dump(self):
 		self._root_node.dump()
 
+	def items(self):
+		return self._entry_by_uid.items()
+
 	def __getitem__(self, entry_uid):
 		return self._entry_by_uid[entry_uid]
 
@@ -19,37 +19,70 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import bisect
+import heapq
+
 class OrderedSet(object):
 	def __init__(self):
+		self._ordered_list = [ ]
+		self._sorted_list = [ ]
+		self._set = set()
 		self._ordered_tuple = tuple()
 		self._sorted_tuple = tuple()
-		self._set = set()
 
-	def add_items(self, items):
-		new_item_list = list(self._ordered_tuple)
+	def _new_items(self, items):
+		new_items = [ ]
 		for item in items:
 			if item not in self._set:
 				self._set.add(item)
-				new_item_list.append(item)
-		self._ordered_tuple = tuple(new_item_list)
-		self._sorted_tuple = tuple(sorted(new_item_list))
+				new_items.append(item)
+		return new_items
+
+	def _invalidate(self):
+		self._ordered_tuple = None
+		self._sorted_tuple = None
+
+	def _merge(self, new_sorted_items):
+		if len(new_sorted_items) == 0:
+			return
+		self._invalidate()
+		if len(new_sorted_items) == 1:
+			bisect.insort(self._sorted_list, new_sorted_items[0])
+		else:
+			self._sorted_list = list(heapq.merge(self._sorted_list, new_sorted_items))
+
+	def add_items(self, items):
+		new_items = self._new_items(items)
+		self._ordered_list += new_items
+		self._merge(sorted(new_items))
+
+	def add_sorted_items(self, items):
+		"""Like add_items(), but the caller guarantees that the given items are
+		already in ascending order, so they can be merged in linear time."""
+		new_items = self._new_items(items)
+		self._ordered_list += new_items
+		self._merge(new_items)
 
 	def add_item(self, item):
 		return self.add_items([ item ])
 
 	@property
 	def ordered_tuple(self):
+		if self._ordered_tuple is None:
+			self._ordered_tuple = tuple(self._ordered_list)
 		return self._ordered_tuple
 
 	@property
 	def sorted_tuple(self):
+		if self._sorted_tuple is None:
+			self._sorted_tuple = tuple(self._sorted_list)
 		return self._sorted_tuple
 
 	def __getitem__(self, index):
-		return self._sorted_tuple[index]
+		return self._sorted_list[index]
 
 	def __len__(self):
-		return len(self._sorted_tuple)
+		return len(self._sorted_list)
 
 	def __iter__(self):
 		return iter(self.sorted_tuple)
@@ -0,0 +1,212 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import csv
+import sys
+import math
+import array
+import bisect
+import struct
+import collections
+from pyengineer.UnitValue import UnitValue
+from pyengineer.Exceptions import InvalidDataException, DataMissingException
+
+class PartCatalog(object):
+	"""Stock list of parts (e.g., resistors from an inventory). Every column
+	is kept in a parallel array sorted by value rather than as one Python
+	object per part so that catalogs with hundreds of thousands of entries
+	stay compact."""
+	_Part = collections.namedtuple("Part", [ "part_number", "value", "tolerance", "power", "package" ])
+	_BINARY_MAGIC = b"pyengcat"
+	_BINARY_VERSION = 1
+	_BINARY_HEADER = struct.Struct("<8sII")
+	_BINARY_BLOB_LENGTH = struct.Struct("<I")
+
+	def __init__(self):
+		self._part_numbers = [ ]
+		self._values = array.array("d")
+		self._tolerances = array.array("d")
+		self._powers = array.array("d")
+		self._packages = [ ]
+		self._sorted = True
+		self._unique_values = None
+
+	def add_part(self, value, part_number = None, tolerance = None, power = None, package = None):
+		value = float(value)
+		if (len(self._values) > 0) and (value < self._values[-1]):
+			self._sorted = False
+		self._part_numbers.append(part_number or "")
+		self._values.append(value)
+		self._tolerances.append(math.nan if (tolerance is None) else float(tolerance))
+		self._powers.append(math.nan if (power is None) else float(power))
+		self._packages.append(package or "")
+		self._unique_values = None
+
+	def _sort(self):
+		if self._sorted:
+			return
+		permutation = sorted(range(len(self._values)), key = self._values.__getitem__)
+		self._part_numbers = [ self._part_numbers[i] for i in permutation ]
+		self._values = array.array("d", (self._values[i] for i in permutation))
+		self._tolerances = array.array("d", (self._tolerances[i] for i in permutation))
+		self._powers = array.array("d", (self._powers[i] for i in permutation))
+		self._packages = [ self._packages[i] for i in permutation ]
+		self._sorted = True
+
+	@property
+	def unique_values(self):
+		"""Sorted, deduplicated part values as array of floats."""
+		if self._unique_values is None:
+			self._sort()
+			self._unique_values = array.array("d")
+			for value in self._values:
+				if (len(self._unique_values) == 0) or (self._unique_values[-1] != value):
+					self._unique_values.append(value)
+		return self._unique_values
+
+	def _get_part(self, index):
+		return self._Part(part_number = self._part_numbers[index], value = self._values[index], tolerance = self._tolerances[index], power = self._powers[index], package = self._packages[index])
+
+	def parts_with_value(self, value):
+		self._sort()
+		value = float(value)
+		begin = bisect.bisect_left(self._values, value)
+		end = bisect.bisect_right(self._values, value)
+		for index in range(begin, end):
+			yield self._get_part(index)
+
+	@staticmethod
+	def _parse_tolerance(text):
+		text = text.strip()
+		if text.endswith("%"):
+			return float(UnitValue(text[:-1])) / 100
+		return float(UnitValue(text))
+
+	@classmethod
+	def load_csv(cls, filename):
+		"""Reads a CSV file with a header row. Only the 'value' column is
+		mandatory, 'part_number', 'tolerance' (either relative or given in
+		percent), 'power' and 'package' are optional."""
+		catalog = cls()
+		with open(filename, "r", newline = "") as f:
+			reader = csv.DictReader(f)
+			if (reader.fieldnames is None) or ("value" not in reader.fieldnames):
+				raise DataMissingException("No 'value' column in part catalog CSV file %s." % (filename))
+			for (lineno, row) in enumerate(reader, 2):
+				try:
+					tolerance = row.get("tolerance") or None
+					power = row.get("power") or None
+					catalog.add_part(value = UnitValue(row["value"]),
+							part_number = row.get("part_number"),
+							tolerance = cls._parse_tolerance(tolerance) if (tolerance is not None) else None,
+							power = UnitValue(power) if (power is not None) else None,
+							package = row.get("package"))
+				except (TypeError, ValueError) as e:
+					raise InvalidDataException("Invalid part in catalog %s line %d: %s" % (filename, lineno, str(e)))
+		return catalog
+
+	@staticmethod
+	def _write_floats(f, values):
+		if sys.byteorder != "little":
+			values = array.array("d", values)
+			values.byteswap()
+		f.write(values.tobytes())
+
+	@staticmethod
+	def _read_floats(data, offset, count):
+		values = array.array("d")
+		values.frombytes(data[offset : offset + (8 * count)])
+		if sys.byteorder != "little":
+			values.byteswap()
+		return (values, offset + (8 * count))
+
+	@classmethod
+	def _write_strings(cls, f, strings):
+		blob = "\0".join(strings).encode("utf-8")
+		f.write(cls._BINARY_BLOB_LENGTH.pack(len(blob)))
+		f.write(blob)
+
+	@classmethod
+	def _read_strings(cls, data, offset, count):
+		(length, ) = cls._BINARY_BLOB_LENGTH.unpack_from(data, offset)
+		offset += cls._BINARY_BLOB_LENGTH.size
+		blob = data[offset : offset + length].decode("utf-8")
+		strings = blob.split("\0") if (count > 0) else [ ]
+		if len(strings) != count:
+			raise InvalidDataException("Part catalog string column has %d entries, expected %d." % (len(strings), count))
+		return (strings, offset + length)
+
+	def write_binary(self, filename):
+		"""Writes the catalog as compact binary columnar file: a header
+		followed by the value, tolerance and power columns as little-endian
+		doubles and the part number and package columns as NUL-separated
+		UTF-8 blobs."""
+		self._sort()
+		with open(filename, "wb") as f:
+			f.write(self._BINARY_HEADER.pack(self._BINARY_MAGIC, self._BINARY_VERSION, len(self._values)))
+			self._write_floats(f, self._values)
+			self._write_floats(f, self._tolerances)
+			self._write_floats(f, self._powers)
+			self._write_strings(f, self._part_numbers)
+			self._write_strings(f, self._packages)
+
+	@classmethod
+	def load_binary(cls, filename):
+		with open(filename, "rb") as f:
+			data = f.read()
+		if len(data) < cls._BINARY_HEADER.size:
+			raise InvalidDataException("Part catalog %s is truncated." % (filename))
+		(magic, version, count) = cls._BINARY_HEADER.unpack_from(data)
+		if magic != cls._BINARY_MAGIC:
+			raise InvalidDataException("Part catalog %s is not a binary part catalog." % (filename))
+		if version != cls._BINARY_VERSION:
+			raise InvalidDataException("Part catalog %s has unsupported version %d." % (filename, version))
+		if len(data) < cls._BINARY_HEADER.size + (3 * 8 * count):
+			raise InvalidDataException("Part catalog %s is truncated." % (filename))
+
+		catalog = cls()
+		offset = cls._BINARY_HEADER.size
+		(catalog._values, offset) = cls._read_floats(data, offset, count)
+		(catalog._tolerances, offset) = cls._read_floats(data, offset, count)
+		(catalog._powers, offset) = cls._read_floats(data, offset, count)
+		(catalog._part_numbers, offset) = cls._read_strings(data, offset, count)
+		(catalog._packages, offset) = cls._read_strings(data, offset, count)
+		catalog._sorted = all(x <= y for (x, y) in zip(catalog._values, catalog._values[1:]))
+		return catalog
+
+	@classmethod
+	def load(cls, filename, file_format = None):
+		if file_format is None:
+			file_format = "csv" if filename.lower().endswith(".csv") else "binary"
+		if file_format == "csv":
+			return cls.load_csv(filename)
+		elif file_format == "binary":
+			return cls.load_binary(filename)
+		else:
+			raise InvalidDataException("Invalid part catalog format '%s' for %s." % (file_format, filename))
+
+	def __len__(self):
+		return len(self._values)
+
+	def __iter__(self):
+		self._sort()
+		for index in range(len(self._values)):
+			yield self._get_part(index)
@@ -0,0 +1,116 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import ast
+import uuid
+import hashlib
+import itertools
+import traceback
+import collections
+import importlib.util
+from .LazyPlugin import LazyPlugin
+
+PluginManifest = collections.namedtuple("PluginManifest", [ "filename", "plugin_id", "title", "menu_hierarchy", "source_hash" ])
+
+class PluginLoader(object):
+	_MODULE_COUNTER = itertools.count()
+
+	def __init__(self, config):
+		self._config = config
+
+	def iter_plugin_filenames(self):
+		plugin_directory = self._config.plugin_directory
+		if not plugin_directory.endswith("/"):
+			plugin_directory += "/"
+		for filename in filter(lambda name: name.endswith(".py"), os.listdir(plugin_directory)):
+			yield plugin_directory + filename
+
+	def load_plugin(self, python_filename):
+		# Every load gets its own module name so that a reloaded plugin never
+		# shares (or clobbers) the module of its previous version
+		module_name = "pyengineer_plugin_%s_%d" % (os.path.splitext(os.path.basename(python_filename))[0], next(self._MODULE_COUNTER))
+		with open(python_filename, "rb") as f:
+			source = f.read()
+		spec = importlib.util.spec_from_file_location(module_name, python_filename)
+		module = importlib.util.module_from_spec(spec)
+		exec(compile(source, python_filename, "exec"), module.__dict__)
+		plugin_class = module.Plugin
+		return plugin_class(self._config, instanciated_from = python_filename, source_hash = self.source_hash(source))
+
+	def load_plugins(self):
+		for python_filename in self.iter_plugin_filenames():
+			yield self.load_plugin(python_filename)
+
+	@staticmethod
+	def source_hash(source):
+		return hashlib.sha256(source).hexdigest()[:16]
+
+	@classmethod
+	def read_manifest(cls, python_filename):
+		"""Extracts ID, title and menu hierarchy from the source of a plugin
+		without importing it. Returns None if they're not all given as
+		literals in the Plugin class."""
+		with open(python_filename, "rb") as f:
+			source = f.read()
+		tree = ast.parse(source, filename = python_filename)
+		for node in tree.body:
+			if (not isinstance(node, ast.ClassDef)) or (node.name != "Plugin"):
+				continue
+			values = { }
+			for statement in node.body:
+				if isinstance(statement, ast.Assign) and (len(statement.targets) == 1) and isinstance(statement.targets[0], ast.Name):
+					name = statement.targets[0].id
+					if name in ("_ID", "_TITLE", "_MENU_HIERARCHY"):
+						try:
+							values[name] = ast.literal_eval(statement.value)
+						except ValueError:
+							return None
+			if len(values) == 3:
+				return PluginManifest(filename = python_filename, plugin_id = uuid.UUID(values["_ID"]), title = values["_TITLE"], menu_hierarchy = values["_MENU_HIERARCHY"], source_hash = cls.source_hash(source))
+		return None
+
+	def load_plugins_lazily(self):
+		"""Like load_plugins(), but plugins with a manifest are only
+		imported when they're first used."""
+		for python_filename in self.iter_plugin_filenames():
+			manifest = self.read_manifest(python_filename)
+			if manifest is None:
+				yield self.load_plugin(python_filename)
+			else:
+				yield LazyPlugin(self, manifest)
+
+	def reload_plugins(self, plugins, filenames):
+		"""Takes a dictionary of plugins keyed by the file they were loaded
+		from and returns a new one in which the plugins of the given (added,
+		modified or removed) files are reloaded. A plugin that fails to load
+		keeps its previous version."""
+		plugins = dict(plugins)
+		for python_filename in filenames:
+			if not os.path.exists(python_filename):
+				plugins.pop(python_filename, None)
+				continue
+			try:
+				plugins[python_filename] = self.load_plugin(python_filename)
+			except Exception:
+				print("Reloading plugin %s failed, keeping previous version." % (python_filename))
+				print(traceback.format_exc())
+		return plugins
@@ -0,0 +1,198 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import queue
+import traceback
+import threading
+import multiprocessing
+from .Configuration import Configuration
+from .PluginLoader import PluginLoader
+from .PluginWatcher import PluginWatcher
+from .Exceptions import RequestTimeoutException, WorkerCrashedException, PluginLoadException
+
+def _worker_main(config_filename, conn):
+	config = Configuration(config_filename)
+	loader = PluginLoader(config)
+	# Plugins are loaded one by one so that a broken plugin only fails its
+	# own requests, like it does in the main process
+	plugins = loader.reload_plugins({ }, list(loader.iter_plugin_filenames()))
+	plugins_by_id = { instance.plugin_id: instance for instance in plugins.values() }
+	if config.plugin_reload_interval is not None:
+		watcher = PluginWatcher(loader)
+	else:
+		watcher = None
+	conn.send("ready")
+	while True:
+		try:
+			job = conn.recv()
+		except EOFError:
+			break
+		if job is None:
+			break
+		if watcher is not None:
+			try:
+				changed = watcher.poll()
+				if len(changed) > 0:
+					plugins = loader.reload_plugins(plugins, changed)
+					plugins_by_id = { instance.plugin_id: instance for instance in plugins.values() }
+			except Exception:
+				print("Polling for changed plugins failed.")
+				print(traceback.format_exc())
+		(method_name, plugin_id, endpoint, parameters, kwargs) = job
+		try:
+			if plugin_id not in plugins_by_id:
+				raise PluginLoadException("Plugin %s could not be loaded in the worker process." % (plugin_id))
+			result = getattr(plugins_by_id[plugin_id], method_name)(endpoint, parameters, **kwargs)
+			if method_name == "request_stream":
+				# Generators can't be sent back, so the stream is collected
+				# here where it counts towards the time budget
+				result = list(result)
+			conn.send((True, result))
+		except Exception as e:
+			conn.send((False, e))
+
+class _PoolWorker(object):
+	def __init__(self, config_filename):
+		(self._conn, child_conn) = multiprocessing.Pipe()
+		self._process = multiprocessing.Process(target = _worker_main, args = (config_filename, child_conn), daemon = True)
+		self._process.start()
+		child_conn.close()
+		self._ready = False
+
+	def execute(self, job, timeout, startup_timeout):
+		"""Returns (status, result) where status is "ok", "exception" (and
+		result is the exception raised by the plugin), "timeout", "crashed"
+		or "startup_timeout". Unless it's "ok" or "exception", the worker is
+		unusable afterwards. The time the worker takes to start up does not
+		count towards the timeout, but has its own startup_timeout."""
+		try:
+			if not self._ready:
+				if not self._conn.poll(startup_timeout):
+					return ("startup_timeout", None)
+				self._conn.recv()
+				self._ready = True
+			self._conn.send(job)
+			if not self._conn.poll(timeout):
+				if self._process.is_alive():
+					return ("timeout", None)
+				else:
+					return ("crashed", None)
+			(success, result) = self._conn.recv()
+		except (EOFError, BrokenPipeError, ConnectionResetError):
+			return ("crashed", None)
+		return ("ok" if success else "exception", result)
+
+	@property
+	def pid(self):
+		return self._process.pid
+
+	def terminate(self):
+		self._process.terminate()
+		self._process.join()
+		self._conn.close()
+
+	def stop(self):
+		try:
+			self._conn.send(None)
+		except (BrokenPipeError, OSError):
+			pass
+		self._process.join(timeout = 1)
+		if self._process.is_alive():
+			self._process.terminate()
+		self._conn.close()
+
+class PluginProcessPool(object):
+	"""Runs plugin requests in a pool of pre-forked worker processes, each of
+	which loads the configuration and all plugins once at startup. Every
+	request has a time budget; a worker which exceeds it is killed and
+	replaced, so a runaway request cannot pin a worker indefinitely."""
+	def __init__(self, config_filename, max_workers = None, timeout = 10, max_batch_timeout = 60, startup_timeout = 60):
+		if max_workers is None:
+			max_workers = multiprocessing.cpu_count()
+		self._config_filename = config_filename
+		self._timeout = timeout
+		self._max_batch_timeout = max_batch_timeout
+		self._startup_timeout = startup_timeout
+		self._workers = [ _PoolWorker(config_filename) for _ in range(max_workers) ]
+		self._idle_workers = queue.Queue()
+		for worker in self._workers:
+			self._idle_workers.put(worker)
+		self._lock = threading.Lock()
+
+	@property
+	def timeout(self):
+		return self._timeout
+
+	def _replace_worker(self, worker):
+		worker.terminate()
+		replacement = _PoolWorker(self._config_filename)
+		with self._lock:
+			self._workers[self._workers.index(worker)] = replacement
+		return replacement
+
+	@property
+	def workers(self):
+		with self._lock:
+			return list(self._workers)
+
+	def execute(self, method_name, instance, endpoint, parameters, timeout = None, **kwargs):
+		if timeout is None:
+			timeout = instance.plugin_request_timeout or self._timeout
+		job = (method_name, instance.plugin_id, endpoint, parameters, kwargs)
+		worker = self._idle_workers.get()
+		try:
+			(status, result) = worker.execute(job, timeout, self._startup_timeout)
+			if status == "timeout":
+				worker = self._replace_worker(worker)
+				raise RequestTimeoutException("Request to %s exceeded its time budget of %g seconds and was cancelled." % (instance.plugin_title, timeout))
+			elif status == "crashed":
+				worker = self._replace_worker(worker)
+				raise WorkerCrashedException("Worker process handling the request to %s terminated unexpectedly." % (instance.plugin_title))
+			elif status == "startup_timeout":
+				worker = self._replace_worker(worker)
+				raise WorkerCrashedException("Worker process for the request to %s did not start up within %g seconds." % (instance.plugin_title, self._startup_timeout))
+		finally:
+			self._idle_workers.put(worker)
+		if status == "exception":
+			raise result
+		return result
+
+	def request(self, instance, endpoint, parameters):
+		return self.execute("request", instance, endpoint, parameters)
+
+	def request_batch(self, instance, endpoint, parameters_list):
+		"""The batch as a whole gets the time budget of all its requests, but
+		at most max_batch_timeout seconds."""
+		timeout = (instance.plugin_request_timeout or self._timeout) * max(1, len(parameters_list))
+		if self._max_batch_timeout is not None:
+			timeout = min(timeout, self._max_batch_timeout)
+		return self.execute("request_batch", instance, endpoint, parameters_list, timeout = timeout)
+
+	def request_stream(self, instance, endpoint, parameters, limit = None):
+		"""Returns the complete list of streamed results, which are computed
+		within the time budget of a single request."""
+		return self.execute("request_stream", instance, endpoint, parameters, limit = limit)
+
+	def shutdown(self):
+		with self._lock:
+			workers = list(self._workers)
+		for worker in workers:
+			worker.stop()
@@ -0,0 +1,45 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+
+class PluginWatcher(object):
+	"""Polls the plugin directory and reports which plugin files have been
+	added, modified or removed since the previous poll."""
+	def __init__(self, loader):
+		self._loader = loader
+		self._stats = self._scan()
+
+	def _scan(self):
+		stats = { }
+		for filename in self._loader.iter_plugin_filenames():
+			try:
+				stat = os.stat(filename)
+			except FileNotFoundError:
+				continue
+			stats[filename] = (stat.st_mtime_ns, stat.st_size)
+		return stats
+
+	def poll(self):
+		stats = self._scan()
+		changed = set(filename for filename in (stats.keys() | self._stats.keys()) if stats.get(filename) != self._stats.get(filename))
+		self._stats = stats
+		return changed
@@ -0,0 +1,318 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import math
+import array
+import heapq
+import bisect
+import itertools
+import threading
+import collections
+
+class _ResultCollector(object):
+	"""Keeps the best networks found so far. Once there are enough of them,
+	the worst one defines the window [low, high] of network values that
+	are still worth looking at."""
+	def __init__(self, target, count, canonicalize):
+		self._target = target
+		self._count = count
+		self._canonicalize = canonicalize
+		self._heap = [ ]
+		self._seen = set()
+		self._counter = itertools.count()
+		self.low = -math.inf
+		self.high = math.inf
+
+	def offer(self, value, part_count, topology):
+		error = (value - self._target) / self._target
+		if not (self.low <= value <= self.high):
+			return
+		key = (abs(error), part_count)
+		if (len(self._heap) >= self._count) and (key >= (-self._heap[0][0], -self._heap[0][1])):
+			return
+		topology = self._canonicalize(topology)
+		if topology in self._seen:
+			return
+		self._seen.add(topology)
+		heapq.heappush(self._heap, (-key[0], -key[1], -next(self._counter), value, error, part_count, topology))
+		if len(self._heap) > self._count:
+			heapq.heappop(self._heap)
+		if len(self._heap) >= self._count:
+			bound = -self._heap[0][0]
+			self.low = self._target * (1 - bound)
+			self.high = self._target * (1 + bound)
+
+	def can_improve(self, part_count):
+		"""Returns False if no network of the given number of parts could
+		make it into the results anymore."""
+		if len(self._heap) < self._count:
+			return True
+		(worst_error, worst_part_count) = (-self._heap[0][0], -self._heap[0][1])
+		return (worst_error > 0) or (part_count < worst_part_count)
+
+	@property
+	def results(self):
+		entries = sorted(self._heap, key = lambda entry: (-entry[0], -entry[1], -entry[2]))
+		return [ ResistorNetworkSynthesis.Result(value = value, error = error, part_count = part_count, topology = topology) for (_, _, _, value, error, part_count, topology) in entries ]
+
+class ResistorNetworkSynthesis(object):
+	"""Finds the series/parallel networks of up to four resistors out of a
+	set of values that come closest to a target resistance.
+
+	All two-part networks are precomputed into a table sorted by value.
+	Larger networks are found meet-in-the-middle: for every part (or
+	two-part network) on one side, the table is bisected for the values the
+	other side would need to have. Networks are searched from fewer to more
+	parts and only those within the error of the worst of the best results
+	found so far are considered (branch-and-bound), so most lookups end up
+	in a window that is empty or holds just a few entries.
+
+	Topologies are nested tuples: a part is its float value, a network is
+	("S", child, ...) for series or ("P", child, ...) for parallel
+	connection of its children."""
+	Result = collections.namedtuple("Result", [ "value", "error", "part_count", "topology" ])
+	_MAX_PARTS = 4
+
+	def __init__(self, values):
+		self._parts = array.array("d", sorted(set(float(value) for value in values)))
+		self._pair_table = None
+		self._pair_table_lock = threading.Lock()
+
+	@property
+	def max_parts(self):
+		return self._MAX_PARTS
+
+	def _get_pair_table(self):
+		"""Returns the values and codes of all pairs, sorted by value. The
+		table is built on first use and published with a single assignment,
+		so concurrent searches never see a partially built table."""
+		pair_table = self._pair_table
+		if pair_table is None:
+			with self._pair_table_lock:
+				if self._pair_table is None:
+					self._pair_table = self._build_pair_table()
+				pair_table = self._pair_table
+		return pair_table
+
+	@property
+	def _pair_values(self):
+		return self._get_pair_table()[0]
+
+	@property
+	def _pair_codes(self):
+		return self._get_pair_table()[1]
+
+	def _build_pair_table(self):
+		parts = self._parts
+		entries = [ ]
+		for i in range(len(parts)):
+			a = parts[i]
+			for j in range(i, len(parts)):
+				b = parts[j]
+				code = 2 * (i * len(parts) + j)
+				entries.append((a + b, code))
+				entries.append((a * b / (a + b), code + 1))
+		entries.sort()
+		pair_values = array.array("d", (value for (value, code) in entries))
+		pair_codes = array.array("q", (code for (value, code) in entries))
+		return (pair_values, pair_codes)
+
+	def _pair_topology(self, index):
+		(pair_index, parallel) = divmod(self._pair_codes[index], 2)
+		(i, j) = divmod(pair_index, len(self._parts))
+		return ("P" if parallel else "S", self._parts[i], self._parts[j])
+
+	@staticmethod
+	def _index_range(values, low, high):
+		return range(bisect.bisect_left(values, low), bisect.bisect_right(values, high))
+
+	@staticmethod
+	def _parallel_bounds(low, high, fixed):
+		"""Returns the range of values that a resistor in parallel to the
+		fixed one may have so that both are within [low, high] or None if
+		there is no such value."""
+		g_fixed = 1 / fixed
+		g_high = (1 / low) if (low > 0) else math.inf
+		g_low = 1 / high
+		upper = g_high - g_fixed
+		if upper <= 0:
+			return None
+		lower = g_low - g_fixed
+		return (1 / upper, (1 / lower) if (lower > 0) else math.inf)
+
+	@classmethod
+	def _topology_sort_key(cls, topology):
+		if isinstance(topology, float):
+			return (0, topology, "")
+		else:
+			return (1, cls.evaluate(topology), str(topology))
+
+	@classmethod
+	def canonicalize(cls, topology):
+		"""Flattens nested series or parallel connections and sorts the
+		children so that equivalent networks have the same topology."""
+		if isinstance(topology, float):
+			return topology
+		operator = topology[0]
+		children = [ ]
+		for child in topology[1 : ]:
+			child = cls.canonicalize(child)
+			if isinstance(child, tuple) and (child[0] == operator):
+				children += child[1 : ]
+			else:
+				children.append(child)
+		children.sort(key = cls._topology_sort_key)
+		return (operator, ) + tuple(children)
+
+	@classmethod
+	def evaluate(cls, topology):
+		if isinstance(topology, float):
+			return topology
+		values = [ cls.evaluate(child) for child in topology[1 : ] ]
+		if topology[0] == "S":
+			return sum(values)
+		else:
+			return 1 / sum(1 / value for value in values)
+
+	@classmethod
+	def format_topology(cls, topology, value_formatter = str):
+		"""Returns a human readable formula, e.g. "1k + (2.2k ∥ 4.7k)"."""
+		if isinstance(topology, float):
+			return value_formatter(topology)
+		separator = " + " if (topology[0] == "S") else " ∥ "
+		return separator.join(value_formatter(child) if isinstance(child, float) else "(" + cls.format_topology(child, value_formatter) + ")" for child in topology[1 : ])
+
+	def _search_nearest(self, collector, values, part_count, topology_callback, target):
+		"""Offers the entries of a sorted table, nearest to the target first,
+		until they're outside the window of the collector."""
+		right = bisect.bisect_left(values, target)
+		left = right - 1
+		while True:
+			left_ok = (left >= 0) and (values[left] >= collector.low)
+			right_ok = (right < len(values)) and (values[right] <= collector.high)
+			if left_ok and ((not right_ok) or (target - values[left] <= values[right] - target)):
+				collector.offer(values[left], part_count, topology_callback(left))
+				left -= 1
+			elif right_ok:
+				collector.offer(values[right], part_count, topology_callback(right))
+				right += 1
+			else:
+				break
+
+	def _search_triples(self, collector):
+		parts = self._parts
+		pair_values = self._pair_values
+		for a in parts:
+			# a + X
+			if a < collector.high:
+				for index in self._index_range(pair_values, collector.low - a, collector.high - a):
+					collector.offer(a + pair_values[index], 3, ("S", a, self._pair_topology(index)))
+
+			# a || X
+			bounds = self._parallel_bounds(collector.low, collector.high, a)
+			if bounds is not None:
+				for index in self._index_range(pair_values, bounds[0], bounds[1]):
+					x = pair_values[index]
+					collector.offer(1 / (1 / a + 1 / x), 3, ("P", a, self._pair_topology(index)))
+
+	def _search_quadruples(self, collector):
+		parts = self._parts
+		pair_values = self._pair_values
+
+		# X + Y with X <= Y, i.e., Y between half of the total and the total;
+		# this band of the table is much narrower than the one for X
+		for y_index in range(bisect.bisect_left(pair_values, collector.low / 2), len(pair_values)):
+			y = pair_values[y_index]
+			if y > collector.high:
+				break
+			x_range = self._index_range(pair_values, collector.low - y, collector.high - y)
+			for x_index in range(x_range.start, min(y_index + 1, x_range.stop)):
+				collector.offer(pair_values[x_index] + y, 4, ("S", self._pair_topology(x_index), self._pair_topology(y_index)))
+
+		# X || Y with X <= Y, i.e., X between the total and twice of it
+		for x_index in range(bisect.bisect_left(pair_values, collector.low), len(pair_values)):
+			x = pair_values[x_index]
+			if x > 2 * collector.high:
+				break
+			bounds = self._parallel_bounds(collector.low, collector.high, x)
+			if bounds is None:
+				continue
+			y_range = self._index_range(pair_values, bounds[0], bounds[1])
+			for y_index in range(max(x_index, y_range.start), y_range.stop):
+				y = pair_values[y_index]
+				collector.offer(1 / (1 / x + 1 / y), 4, ("P", self._pair_topology(x_index), self._pair_topology(y_index)))
+
+		# The loops over two single parts are the hot spots; window
+		# computation and bisection are inlined there and as most windows
+		# are empty, only their start is bisected.
+		bisect_left = bisect.bisect_left
+		bisect_right = bisect.bisect_right
+		pair_count = len(pair_values)
+
+		# a + (b || X); b must be larger than what remains for (b || X)
+		for a in parts:
+			if a >= collector.high:
+				break
+			for b_index in range(bisect_right(parts, collector.low - a), len(parts)):
+				b = parts[b_index]
+				(rest_low, rest_high) = (collector.low - a, collector.high - a)
+				g_b = 1 / b
+				upper = ((1 / rest_low) if (rest_low > 0) else math.inf) - g_b
+				if upper <= 0:
+					continue
+				lower = (1 / rest_high) - g_b
+				x_high = (1 / lower) if (lower > 0) else math.inf
+				index = bisect_left(pair_values, 1 / upper)
+				while (index < pair_count) and (pair_values[index] <= x_high):
+					collector.offer(a + 1 / (g_b + 1 / pair_values[index]), 4, ("S", a, ("P", b, self._pair_topology(index))))
+					index += 1
+
+		# a || (b + X); b must be smaller than what is needed for (b + X)
+		for a_index in range(bisect_right(parts, collector.low), len(parts)):
+			a = parts[a_index]
+			bounds = self._parallel_bounds(collector.low, collector.high, a)
+			if bounds is None:
+				continue
+			(rest_low, rest_high) = bounds
+			for b in parts:
+				if b >= rest_high:
+					break
+				x_high = rest_high - b
+				index = bisect_left(pair_values, rest_low - b)
+				while (index < pair_count) and (pair_values[index] <= x_high):
+					collector.offer(1 / (1 / a + 1 / (b + pair_values[index])), 4, ("P", a, ("S", b, self._pair_topology(index))))
+					index += 1
+
+	def search(self, target, max_parts = 4, count = 15):
+		"""Returns the (at most) count networks of up to max_parts resistors
+		closest to the target value, best first. Among equally good networks,
+		the ones with fewer parts are preferred."""
+		assert(1 <= max_parts <= self._MAX_PARTS)
+		target = float(target)
+		collector = _ResultCollector(target, count, self.canonicalize)
+		self._search_nearest(collector, self._parts, 1, lambda index: self._parts[index], target)
+		if (max_parts >= 2) and collector.can_improve(2):
+			self._search_nearest(collector, self._pair_values, 2, self._pair_topology, target)
+		if (max_parts >= 3) and collector.can_improve(3):
+			self._search_triples(collector)
+		if (max_parts >= 4) and collector.can_improve(4):
+			self._search_quadruples(collector)
+		return collector.results
@@ -0,0 +1,135 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import time
+import sqlite3
+import threading
+import traceback
+
+class SharedCache(object):
+	"""Cache backed by an SQLite database in a local file so that all worker
+	processes of a multi-process server share their results. Entries expire
+	after a TTL; when there are more than max_entries, the oldest ones are
+	evicted. Database errors (e.g., a locked database or a full disk) on
+	get() and put() are logged and treated like a miss or not caching the
+	value, respectively."""
+	_EVICTION_INTERVAL = 64
+
+	def __init__(self, filename, ttl = 3600, max_entries = 10000):
+		assert(max_entries >= 1)
+		self._filename = filename
+		self._ttl = ttl
+		self._max_entries = max_entries
+		self._local = threading.local()
+		self._lock = threading.Lock()
+		self._hits = 0
+		self._misses = 0
+		self._puts = 0
+		with self._connection as conn:
+			conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, created REAL NOT NULL);")
+			conn.execute("CREATE INDEX IF NOT EXISTS cache_created ON cache (created);")
+
+	@property
+	def _connection(self):
+		# SQLite connections must neither be shared between threads nor be
+		# carried over into a forked worker process
+		conn = getattr(self._local, "conn", None)
+		if (conn is None) or (self._local.pid != os.getpid()):
+			conn = sqlite3.connect(self._filename, timeout = 10)
+			conn.execute("PRAGMA journal_mode=WAL;")
+			conn.execute("PRAGMA synchronous=NORMAL;")
+			self._local.conn = conn
+			self._local.pid = os.getpid()
+		return conn
+
+	@property
+	def ttl(self):
+		return self._ttl
+
+	@property
+	def max_entries(self):
+		return self._max_entries
+
+	@property
+	def hits(self):
+		return self._hits
+
+	@property
+	def misses(self):
+		return self._misses
+
+	def get(self, key, default = None):
+		try:
+			row = self._connection.execute("SELECT value FROM cache WHERE (key = ?) AND (created >= ?);", (key, time.time() - self._ttl)).fetchone()
+		except sqlite3.Error:
+			print("Reading from shared cache %s failed." % (self._filename))
+			print(traceback.format_exc())
+			row = None
+		with self._lock:
+			if row is None:
+				self._misses += 1
+				return default
+			else:
+				self._hits += 1
+				return row[0]
+
+	def put(self, key, value):
+		try:
+			with self._connection as conn:
+				conn.execute("INSERT OR REPLACE INTO cache (key, value, created) VALUES (?, ?, ?);", (key, value, time.time()))
+			with self._lock:
+				self._puts += 1
+				evict = (self._puts % self._EVICTION_INTERVAL) == 0
+			if evict:
+				self.evict()
+		except sqlite3.Error:
+			print("Writing to shared cache %s failed." % (self._filename))
+			print(traceback.format_exc())
+
+	def evict(self):
+		with self._connection as conn:
+			conn.execute("DELETE FROM cache WHERE created < ?;", (time.time() - self._ttl, ))
+			conn.execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY created DESC LIMIT -1 OFFSET ?);", (self._max_entries, ))
+
+	def discard_prefix(self, prefix):
+		"""Removes all entries whose key starts with the given prefix."""
+		with self._connection as conn:
+			conn.execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?;", (len(prefix), prefix))
+
+	def clear(self):
+		with self._connection as conn:
+			conn.execute("DELETE FROM cache;")
+
+	def to_dict(self):
+		return {
+			"size":		len(self),
+			"maxsize":	self.max_entries,
+			"hits":		self.hits,
+			"misses":	self.misses,
+		}
+
+	def __contains__(self, key):
+		row = self._connection.execute("SELECT 1 FROM cache WHERE (key = ?) AND (created >= ?);", (key, time.time() - self._ttl)).fetchone()
+		return row is not None
+
+	def __len__(self):
+		return self._connection.execute("SELECT COUNT(*) FROM cache;").fetchone()[0]
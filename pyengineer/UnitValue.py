@@ -19,8 +19,9 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
-import enum
+import re
 import math
+import functools
 import collections
 from fractions import Fraction
 
@@ -42,33 +43,84 @@ class UnitValue(object):
 		("c",	-2),
 		("d",	-1),
 	)
+	_DECODE_PREFIX_EXPONENTS = dict(_SI_PREFIXES + _ADDITIONAL_DECODE_PREFIXES)
+	_PARSE_REGEX = re.compile(r"\s*(?P<significand>[-+]?(?:\d+\.?\d*|\.\d+))(?:[eE](?P<exponent>[-+]?\d+))?\s*(?P<prefix>%s)?[\t\n ]*" % ("|".join(re.escape(prefix) for prefix in _DECODE_PREFIX_EXPONENTS)))
+	# First entry per decade wins, i.e., "µ" is preferred over "u" for output
+	_FORMAT_PREFIXES = dict(((si_exponent // 3), (si_prefix, si_exponent)) for (si_prefix, si_exponent) in reversed(_SI_PREFIXES + (("", 0), )))
+	_MIN_FORMAT_DECADE = min(_FORMAT_PREFIXES)
+	_MAX_FORMAT_DECADE = max(_FORMAT_PREFIXES)
+	_ParsedString = collections.namedtuple("ParsedString", [ "float_value", "significand", "exponent" ])
 
 	def __init__(self, value, repr_callback = None):
 		self._repr_callback = repr_callback
 		if isinstance(value, UnitValue):
 			self._value = value._value
+			self._float_value = value._float_value
 			self._raw_value = value._raw_value
 		else:
 			self._raw_value = value
-
-			# Unit specified?
-			exponent = 0
-			if isinstance(value, str):
-				value = value.rstrip("\t\n ")
-				for (si_prefix, si_exponent) in self._SI_PREFIXES + self._ADDITIONAL_DECODE_PREFIXES:
-					if value.endswith(si_prefix):
-						exponent = si_exponent
-						value = value[:-len(si_prefix)]
-						break
-			if exponent > 0:
-				self._value = Fraction(value) * (10 ** exponent)
-			else:
-				self._value = Fraction(value) / (10 ** -exponent)
+			self._value = None
+			try:
+				if isinstance(value, str):
+					self._float_value = self._parse_string(value).float_value
+				elif isinstance(value, (int, float)):
+					self._float_value = float(value)
+				else:
+					self._value = Fraction(value)
+					self._float_value = float(self._value)
+			except OverflowError:
+				raise ValueError("Value out of range: %s" % (str(value)))
+			if not math.isfinite(self._float_value):
+				raise ValueError("Value is not a finite number: %s" % (str(value)))
 		if self._repr_callback is None:
 			self._repr_callback = lambda value: value.raw_value
 
+	@classmethod
+	def _split_si_prefix(cls, value):
+		value = value.rstrip("\t\n ")
+		for (si_prefix, si_exponent) in cls._SI_PREFIXES + cls._ADDITIONAL_DECODE_PREFIXES:
+			if value.endswith(si_prefix):
+				return (value[:-len(si_prefix)], si_exponent)
+		return (value, 0)
+
+	@staticmethod
+	def _significand_to_fraction(significand, exponent):
+		if exponent > 0:
+			return Fraction(significand) * (10 ** exponent)
+		else:
+			return Fraction(significand) / (10 ** -exponent)
+
+	@classmethod
+	@functools.lru_cache(maxsize = 4096)
+	def _parse_string(cls, value):
+		"""Parses sign, decimal, exponent and SI prefix in one pass. Form
+		inputs are mostly the same few strings over and over again, so results
+		are cached."""
+		match = cls._PARSE_REGEX.fullmatch(value)
+		if match is None:
+			# Not a plain decimal number (e.g., given as a ratio), let
+			# Fraction figure it out.
+			(significand, exponent) = cls._split_si_prefix(value)
+			float_value = float(cls._significand_to_fraction(significand, exponent))
+			return cls._ParsedString(float_value = float_value, significand = significand, exponent = exponent)
+
+		significand = match.group("significand")
+		exponent = int(match.group("exponent") or 0)
+		if match.group("prefix") is not None:
+			exponent += cls._DECODE_PREFIX_EXPONENTS[match.group("prefix")]
+		# Appending the exponent lets float() do the scaling in a single,
+		# correctly rounded step; this is what float(Fraction) would give.
+		float_value = float("%se%d" % (significand, exponent))
+		return cls._ParsedString(float_value = float_value, significand = significand, exponent = exponent)
+
 	@property
 	def exact_value(self):
+		if self._value is None:
+			if isinstance(self._raw_value, str):
+				parsed = self._parse_string(self._raw_value)
+				self._value = self._significand_to_fraction(parsed.significand, parsed.exponent)
+			else:
+				self._value = Fraction(self._raw_value)
 		return self._value
 
 	@property
@@ -79,33 +131,39 @@ class UnitValue(object):
 	def representation(self):
 		return self._repr_callback(self)
 
-	def format(self, significant_digits = 3):
-		assert(significant_digits >= 1)
-		if self._value < 0:
-			value = -self._value
+	@staticmethod
+	def _scale_down(value, exponent):
+		if exponent > 0:
+			return value / (10 ** exponent)
+		else:
+			return value * (10 ** -exponent)
+
+	@classmethod
+	def _format_float(cls, value, significant_digits):
+		if value < 0:
+			value = -value
 			sign = "-"
 		else:
-			value = self._value
 			sign = ""
 		if (value == 0) or (1 <= value < 1000):
-			si_prefix = None
-			mantissa = float(value)
+			si_prefix = ""
+			mantissa = value
 		else:
-			for (si_prefix, si_exponent) in self._SI_PREFIXES:
-				if si_exponent > 0:
-					mantissa = value / (10 ** si_exponent)
-				else:
-					mantissa = value * (10 ** -si_exponent)
-				if 1 <= mantissa < 1000:
-					break
-			else:
-				if self._value < 1:
-					# Smaller than smallest unit
-					(si_prefix, si_exponent) = self._SI_PREFIXES[0]
-				else:
-					# Larger than largest unit
-					(si_prefix, si_exponent) = self._SI_PREFIXES[-1]
-				mantissa = float(value / (10 ** si_exponent))
+			decade = math.floor(math.log10(value)) // 3
+			decade = min(max(decade, cls._MIN_FORMAT_DECADE), cls._MAX_FORMAT_DECADE)
+			(si_prefix, si_exponent) = cls._FORMAT_PREFIXES[decade]
+			mantissa = cls._scale_down(value, si_exponent)
+
+			# log10 can be off by one ulp right at a decade boundary, correct
+			# for that unless we are already clamped at the smallest/largest
+			# unit.
+			if (mantissa < 1) and (decade > cls._MIN_FORMAT_DECADE):
+				(si_prefix, si_exponent) = cls._FORMAT_PREFIXES[decade - 1]
+				mantissa = cls._scale_down(value, si_exponent)
+			elif (mantissa >= 1000) and (decade < cls._MAX_FORMAT_DECADE):
+				(si_prefix, si_exponent) = cls._FORMAT_PREFIXES[decade + 1]
+				mantissa = cls._scale_down(value, si_exponent)
+
 		if value == 0:
 			pre_decimal = 1
 		else:
@@ -113,15 +171,22 @@ class UnitValue(object):
 		post_decimal = significant_digits - pre_decimal
 		if post_decimal < 0:
 			post_decimal = 0
-		if si_prefix is None:
-			unit_str = ""
-		else:
-			unit_str = si_prefix
-		return "%s%.*f %s" % (sign, post_decimal, mantissa, unit_str)
+		return "%s%.*f %s" % (sign, post_decimal, mantissa, si_prefix)
+
+	def format(self, significant_digits = 3):
+		assert(significant_digits >= 1)
+		return self._format_float(self._float_value, significant_digits)
+
+	@classmethod
+	def format_many(cls, values, significant_digits = 3):
+		"""Formats a sequence of values (floats or UnitValues) at once without
+		creating an intermediate UnitValue for each one of them."""
+		assert(significant_digits >= 1)
+		return [ cls._format_float(float(value), significant_digits) for value in values ]
 
 	def to_dict(self, significant_digits = 3, include_raw = False, include_repr = False, include_fractional = False):
 		result = {
-			"flt":		float(self),
+			"flt":		self._float_value,
 			"fmt":		self.format(significant_digits = significant_digits),
 		}
 		if include_raw:
@@ -132,29 +197,43 @@ class UnitValue(object):
 			result["fractional"] = self.get_fractional()
 		return result
 
+	@classmethod
+	def to_dict_many(cls, values, significant_digits = 3):
+		"""Equivalent of calling to_dict() on every value of the sequence, but
+		for plain floats as well as UnitValues."""
+		assert(significant_digits >= 1)
+		result = [ ]
+		for value in values:
+			value = float(value)
+			result.append({
+				"flt":		value,
+				"fmt":		cls._format_float(value, significant_digits),
+			})
+		return result
+
 	def __ge__(self, other):
-		return self._value >= other._value
+		return self._float_value >= other._float_value
 
 	def __gt__(self, other):
-		return self._value > other._value
+		return self._float_value > other._float_value
 
 	def __le__(self, other):
-		return self._value <= other._value
+		return self._float_value <= other._float_value
 
 	def __lt__(self, other):
-		return self._value < other._value
+		return self._float_value < other._float_value
 
 	def __eq__(self, other):
-		return self._value == other._value
+		return self._float_value == other._float_value
 
 	def __neq__(self, other):
 		return not (self == other)
 
 	def __hash__(self):
-		return hash(self._value)
+		return hash(self._float_value)
 
 	def __float__(self):
-		return float(self._value)
+		return self._float_value
 
 	def __repr__(self):
 		return "UV(%s)" % (self.representation)
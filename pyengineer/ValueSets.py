@@ -19,12 +19,17 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
+import array
+import threading
+import heapq
 import bisect
 from pyengineer import UnitValue, ESeries, OrderedSet
-from pyengineer.Exceptions import DuplicateEntryException, DataMissingException, InvalidDataException
+from pyengineer.PartCatalog import PartCatalog
+from pyengineer.Exceptions import DuplicateEntryException, DataMissingException, InvalidDataException, CircularReferenceException
 
 class ValueSet(object):
-	def __init__(self, name, values, additional_data = None):
+	def __init__(self, name, values, additional_data = None, catalog = None):
 		self._name = name
 		self._values = OrderedSet()
 		if values is not None:
@@ -33,6 +38,8 @@ class ValueSet(object):
 		else:
 			self._resolved = False
 		self._additional_data = additional_data
+		self._float_index = None
+		self._catalog = catalog
 
 	@property
 	def name(self):
@@ -42,9 +49,26 @@ class ValueSet(object):
 	def values(self):
 		return self._values
 
+	@property
+	def catalog(self):
+		return self._catalog
+
+	@property
+	def float_index(self):
+		"""Sorted float values of the set, in the same order as the values
+		themselves. Used for bisecting without any UnitValue comparisons."""
+		if self._float_index is None:
+			self._float_index = array.array("d", (float(value) for value in self._values))
+		return self._float_index
+
+	@staticmethod
+	def _to_float(value):
+		if isinstance(value, str):
+			value = UnitValue(value)
+		return float(value)
+
 	def find_closest(self, value):
-		value = UnitValue(value)
-		index = bisect.bisect(self._values, value) - 1
+		index = bisect.bisect(self.float_index, self._to_float(value)) - 1
 		if index >= 0:
 			smaller = self._values[index]
 		else:
@@ -62,15 +86,44 @@ class ValueSet(object):
 		if larger is not None:
 			yield larger
 
+	def find_closest_many(self, values):
+		"""Vectorized variant of find_closest(). Returns two lists which, for
+		each given value, hold the index of the smaller and larger neighbour
+		within the set (or None if there is no such neighbour). The values are
+		located in ascending order, so that every bisection only needs to
+		search the part of the float index after the previous value."""
+		values = [ self._to_float(value) for value in values ]
+		float_index = self.float_index
+		smaller_indices = [ None ] * len(values)
+		larger_indices = [ None ] * len(values)
+		insert_index = 0
+		for value_index in sorted(range(len(values)), key = values.__getitem__):
+			value = values[value_index]
+			insert_index = bisect.bisect_right(float_index, value, insert_index)
+			if insert_index > 0:
+				smaller_indices[value_index] = insert_index - 1
+			if insert_index < len(float_index):
+				larger_indices[value_index] = insert_index
+		return (smaller_indices, larger_indices)
+
+	def iter_closest_many(self, values):
+		"""For each given value, yields a tuple of the neighbours that
+		iter_closest() would have returned."""
+		(smaller_indices, larger_indices) = self.find_closest_many(values)
+		for (smaller_index, larger_index) in zip(smaller_indices, larger_indices):
+			yield tuple(self._values[index] for index in (smaller_index, larger_index) if index is not None)
+
 	def iter_range(self, min_value, max_value):
-		min_index = bisect.bisect(self._values, UnitValue(min_value)) - 1
-		max_index = bisect.bisect(self._values, UnitValue(max_value))
+		min_index = bisect.bisect(self.float_index, self._to_float(min_value)) - 1
+		max_index = bisect.bisect(self.float_index, self._to_float(max_value))
 		for index in range(min_index, max_index + 1):
 			if 0 <= index < len(self._values):
 				yield self._values[index]
 
 	@classmethod
-	def from_dict(cls, dict_data):
+	def from_dict(cls, dict_data, base_directory = None):
+		"""Relative filenames (of catalogs) are resolved against the
+		base_directory, if given."""
 		if not "name" in dict_data:
 			raise DataMissingException("No 'name' attribute in ValueSet definition: %s" % (str(dict_data)))
 		if not "type" in dict_data:
@@ -93,6 +146,18 @@ class ValueSet(object):
 			(minval, maxval) = UnitValue(dict_data["min"]), UnitValue(dict_data["max"])
 			values = [ UnitValue(v) for v in eseries.from_to(minval.exact_value, maxval.exact_value, maxvalue_inclusive = True) ]
 			return cls(name = dict_data["name"], values = values)
+		elif vs_type == "catalog":
+			if not "filename" in dict_data:
+				raise DataMissingException("No 'filename' attribute in catalog ValueSet definition: %s" % (str(dict_data)))
+			filename = dict_data["filename"]
+			if (base_directory is not None) and (not os.path.isabs(filename)):
+				filename = os.path.join(base_directory, filename)
+			catalog = PartCatalog.load(filename, file_format = dict_data.get("format"))
+			valueset = cls(name = dict_data["name"], values = [ ], catalog = catalog)
+			valueset._values.add_sorted_items(UnitValue(value) for value in catalog.unique_values)
+			# The catalog already has the sorted, unique floats
+			valueset._float_index = catalog.unique_values
+			return valueset
 		elif vs_type == "union":
 			if not "groups" in dict_data:
 				raise DataMissingException("No 'groups' attribute in union ValueSet definition: %s" % (str(dict_data)))
@@ -110,13 +175,25 @@ class ValueSet(object):
 	def resolved(self):
 		return self._resolved
 
+	@property
+	def dependencies(self):
+		if self.resolved:
+			return tuple()
+		return tuple(self._additional_data)
+
 	def resolve(self, valuesets):
 		if self.resolved:
 			return
-		for group_name in self._additional_data:
-			self._values.add_items(valuesets[group_name])
+		members = [ valuesets[group_name] for group_name in self._additional_data ]
+		assert(all(member.resolved for member in members))
+		# All members are sorted already, so a k-way merge does the trick
+		self._values.add_sorted_items(heapq.merge(*members))
+		self._float_index = None
 		self._resolved = True
 
+	def __getitem__(self, index):
+		return self._values[index]
+
 	def __iter__(self):
 		return iter(self._values)
 
@@ -124,34 +201,91 @@ class ValueSet(object):
 		return len(self._values)
 
 class ValueSets(object):
+	"""Collection of named value sets. Sets which are created from their
+	definition are only built (i.e., E-series generated or catalogs read)
+	once they are first accessed."""
 	def __init__(self):
 		self._sets = { }
-
+		self._definitions = { }
+		self._base_directory = None
+		self._lock = threading.RLock()
 
 	def add_set(self, valueset):
-		if valueset.name in self._sets:
+		if (valueset.name in self._sets) or (valueset.name in self._definitions):
 			raise DuplicateEntryException("Valueset %s defined twice." % (valueset.name))
 		self._sets[valueset.name] = valueset
 
+	def _add_definition(self, dict_data):
+		if not "name" in dict_data:
+			raise DataMissingException("No 'name' attribute in ValueSet definition: %s" % (str(dict_data)))
+		name = dict_data["name"]
+		if (name in self._sets) or (name in self._definitions):
+			raise DuplicateEntryException("Valueset %s defined twice." % (name))
+		self._definitions[name] = dict_data
+
+	def _dependencies_of(self, name):
+		if name in self._sets:
+			return self._sets[name].dependencies
+		dict_data = self._definitions[name]
+		if dict_data.get("type") != "union":
+			return tuple()
+		return tuple(dict_data.get("groups", [ ]))
+
 	@classmethod
-	def from_dict(cls, dict_data):
+	def from_dict(cls, dict_data, base_directory = None):
 		valuesets = cls()
-
-		# Add all sets first
+		valuesets._base_directory = base_directory
 		for valueset_data in dict_data:
-			valueset = ValueSet.from_dict(valueset_data)
-			valuesets.add_set(valueset)
-
-		# Do a second pass over all valuesets to resolve cross-references
-		# TODO: This in unable to handle recursive cross-references for now
-		for valueset in valuesets:
-			if not valueset.resolved:
-				valueset.resolve(valuesets)
+			valuesets._add_definition(valueset_data)
 
+		# Cross-references are checked right away, even though the sets
+		# themselves are only created on demand
+		verified = set()
+		for name in valuesets._definitions:
+			valuesets._check_references(name, pending = [ ], verified = verified)
 		return valuesets
 
+	def _check_references(self, name, pending, verified):
+		"""Depth-first search over the references of the given set. Sets in
+		verified are already known to be fine and not visited again, so
+		shared sub-unions are only checked once."""
+		if name in verified:
+			return
+		if name in pending:
+			raise CircularReferenceException("Valueset %s references itself: %s" % (name, " -> ".join(pending + [ name ])))
+		pending.append(name)
+		for dependency_name in self._dependencies_of(name):
+			if (dependency_name not in self._sets) and (dependency_name not in self._definitions):
+				raise DataMissingException("Valueset %s references undefined valueset %s." % (name, dependency_name))
+			self._check_references(dependency_name, pending, verified)
+		pending.pop()
+		verified.add(name)
+
+	def _get(self, set_name):
+		valueset = self._sets.get(set_name)
+		if (valueset is not None) and valueset.resolved:
+			return valueset
+		with self._lock:
+			return self._materialize(set_name)
+
+	def _materialize(self, set_name):
+		valueset = self._sets.get(set_name)
+		if valueset is None:
+			if set_name not in self._definitions:
+				raise KeyError(set_name)
+			valueset = ValueSet.from_dict(self._definitions[set_name], base_directory = self._base_directory)
+			self._sets[set_name] = valueset
+		if not valueset.resolved:
+			# Dependencies first; references were checked to be acyclic
+			for dependency_name in valueset.dependencies:
+				self._materialize(dependency_name)
+			valueset.resolve(self._sets)
+		return valueset
+
 	def __getitem__(self, set_name):
-		return self._sets[set_name]
+		return self._get(set_name)
 
 	def __iter__(self):
-		return iter(self._sets.values())
+		names = list(self._definitions)
+		names += [ name for name in self._sets if name not in self._definitions ]
+		return (self._get(name) for name in names)
@@ -24,6 +24,7 @@ from .OrderedSet import OrderedSet
 from .UnitValue import UnitValue
 from .UnitConversion import UnitConversion
 from .ESeries import ESeries
+from .PartCatalog import PartCatalog
 from .Threads import Thread, ThreadDB
 from .Exceptions import GeneralException, InputDataException
 from .Configuration import Configuration
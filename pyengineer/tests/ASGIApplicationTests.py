@@ -0,0 +1,96 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import json
+import flask
+import asyncio
+import unittest
+from pyengineer.ASGIApplication import ASGIApplication
+
+class ASGIApplicationTests(unittest.TestCase):
+	def setUp(self):
+		app = flask.Flask(__name__)
+		app.add_url_rule("/", "index", lambda: "<html>Index of %s</html>" % (flask.request.args.get("name")))
+		app.add_url_rule("/echo", "echo", lambda: flask.jsonify(flask.request.json), methods = [ "POST" ])
+		app.add_url_rule("/stream", "stream", lambda: flask.Response((json.dumps({ "data": i }) + "\n" for i in range(3)), mimetype = "application/x-ndjson"))
+		self._shutdown_called = False
+		self._application = ASGIApplication(app, max_threads = 2, on_shutdown = self._on_shutdown)
+		self._loop = asyncio.new_event_loop()
+
+	def tearDown(self):
+		self._loop.close()
+
+	def _on_shutdown(self):
+		self._shutdown_called = True
+
+	def _call(self, scope, messages):
+		messages = list(messages)
+		sent = [ ]
+		async def receive():
+			return messages.pop(0)
+		async def send(message):
+			sent.append(message)
+		self._loop.run_until_complete(self._application(scope, receive, send))
+		return sent
+
+	def _request(self, method, path, query_string = b"", headers = None, body = b""):
+		scope = {
+			"type":			"http",
+			"method":		method,
+			"path":			path,
+			"query_string":	query_string,
+			"headers":		headers or [ ],
+		}
+		sent = self._call(scope, [ { "type": "http.request", "body": body, "more_body": False } ])
+		self.assertEqual(sent[0]["type"], "http.response.start")
+		self.assertTrue(all(message["type"] == "http.response.body" for message in sent[1:]))
+		self.assertFalse(sent[-1].get("more_body", False))
+		return (sent[0]["status"], dict(sent[0]["headers"]), b"".join(message["body"] for message in sent[1:]))
+
+	def test_get(self):
+		(status, headers, body) = self._request("GET", "/", query_string = b"name=foo")
+		self.assertEqual(status, 200)
+		self.assertTrue(headers[b"content-type"].startswith(b"text/html"))
+		self.assertEqual(body, b"<html>Index of foo</html>")
+
+	def test_post(self):
+		(status, headers, body) = self._request("POST", "/echo", headers = [ (b"content-type", b"application/json") ], body = b"{\"x\": 1}")
+		self.assertEqual(status, 200)
+		self.assertEqual(json.loads(body.decode("utf-8")), { "x": 1 })
+
+	def test_stream(self):
+		(status, headers, body) = self._request("GET", "/stream")
+		self.assertEqual(status, 200)
+		self.assertEqual(headers[b"content-type"], b"application/x-ndjson")
+		self.assertEqual([ json.loads(line) for line in body.decode("utf-8").splitlines() ], [ { "data": i } for i in range(3) ])
+
+	def test_not_found(self):
+		(status, headers, body) = self._request("GET", "/nonexistent")
+		self.assertEqual(status, 404)
+
+	def test_lifespan(self):
+		sent = self._call({ "type": "lifespan" }, [ { "type": "lifespan.startup" }, { "type": "lifespan.shutdown" } ])
+		self.assertEqual([ message["type"] for message in sent ], [ "lifespan.startup.complete", "lifespan.shutdown.complete" ])
+		self.assertTrue(self._shutdown_called)
+
+	def test_websocket_rejected(self):
+		sent = self._call({ "type": "websocket", "path": "/" }, [ { "type": "websocket.connect" } ])
+		self.assertEqual(sent, [ { "type": "websocket.close", "code": 1000 } ])
@@ -0,0 +1,64 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+
+import os
+import unittest
+from .PluginTestEnvironment import PluginTestEnvironment
+
+class BasicParallelResistorsTests(unittest.TestCase):
+	_PLUGIN_FILENAME = os.path.join(os.path.dirname(__file__), "..", "..", "plugins", "BasicParallelResistors.py")
+
+	def setUp(self):
+		self._env = PluginTestEnvironment()
+		loader = self._env.create_loader(valuesets = { "r": [
+			{ "name": "E12", "type": "eseries", "series": 12, "min": "1", "max": "1M" },
+			{ "name": "small", "type": "explicit", "items": [ "1", "2", "3", "4", "6", "12" ] },
+		] })
+		self._plugin = loader.load_plugin(self._PLUGIN_FILENAME)
+
+	def tearDown(self):
+		self._env.cleanup()
+
+	def _options(self, r, r_set):
+		options = self._plugin.request("default", { "r": r, "r_set": r_set })["options"]
+		return [ (option["r1"]["fmt"], option["r2"]["fmt"], option["r"]["repr"], round(option["error"], 9), round(option["ratio"], 9)) for option in options ]
+
+	def test_eseries(self):
+		self.assertEqual(self._options("12345", "E12"), [
+			("18.0 k", "39.0 k", "12.32 k", -0.002366183, 2.166666667),
+			("15.0 k", "68.0 k", "12.29 k", -0.004523562, 4.533333333),
+			("22.0 k", "27.0 k", "12.12 k", -0.018027624, 1.227272727),
+			("15.0 k", "82.0 k", "12.68 k", 0.027169896, 5.466666667),
+			("18.0 k", "47.0 k", "13.02 k", 0.054304141, 2.611111111),
+			("22.0 k", "33.0 k", "13.20 k", 0.069258809, 1.5),
+			("27.0 k", "27.0 k", "13.50 k", 0.093560146, 1.0),
+		])
+
+	def test_ties_ordered_by_ratio(self):
+		# Pairs with the same absolute error are ordered by ascending ratio
+		self.assertEqual(self._options("2.4", "small"), [
+			("4.00 ", "6.00 ", "2.400 ", 0.0, 1.5),
+			("3.00 ", "12.0 ", "2.400 ", 0.0, 4.0),
+			("4.00 ", "4.00 ", "2.000 ", -0.166666667, 1.0),
+			("3.00 ", "6.00 ", "2.000 ", -0.166666667, 2.0),
+			("6.00 ", "6.00 ", "3.000 ", 0.25, 1.0),
+		])
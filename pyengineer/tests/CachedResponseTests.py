@@ -0,0 +1,73 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import gzip
+import json
+import flask
+import unittest
+from pyengineer.CachedResponse import CachedResponse
+
+class CachedResponseTests(unittest.TestCase):
+	def setUp(self):
+		self._app = flask.Flask(__name__)
+		self._response = CachedResponse.from_json({ "values": list(range(100)) })
+
+	def _serve(self, headers = None):
+		with self._app.test_request_context("/config", headers = headers):
+			return self._response.serve(flask.request)
+
+	def test_identity(self):
+		response = self._serve()
+		self.assertEqual(response.status_code, 200)
+		self.assertNotIn("Content-Encoding", response.headers)
+		self.assertEqual(json.loads(response.get_data()), { "values": list(range(100)) })
+		self.assertEqual(response.get_etag(), (self._response.etag, False))
+		self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+
+	def test_gzip(self):
+		response = self._serve({ "Accept-Encoding": "gzip" })
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response.headers["Content-Encoding"], "gzip")
+		self.assertEqual(gzip.decompress(response.get_data()), self._response.data)
+		self.assertEqual(response.get_etag(), (self._response.etag + "-gzip", False))
+
+	def test_incompressible(self):
+		cached_response = CachedResponse(b"x", mimetype = "text/plain")
+		self.assertIsNone(cached_response.gzip_data)
+		with self._app.test_request_context("/", headers = { "Accept-Encoding": "gzip" }):
+			response = cached_response.serve(flask.request)
+		self.assertNotIn("Content-Encoding", response.headers)
+		self.assertEqual(response.get_data(), b"x")
+
+	def test_if_none_match(self):
+		etag = self._response.etag
+		response = self._serve({ "If-None-Match": "\"%s\"" % (etag) })
+		self.assertEqual(response.status_code, 304)
+		self.assertEqual(response.get_data(), b"")
+
+		response = self._serve({ "If-None-Match": "\"%s\"" % ("0" * 32) })
+		self.assertEqual(response.status_code, 200)
+
+		# Identity ETag does not match the compressed representation
+		response = self._serve({ "If-None-Match": "\"%s\"" % (etag), "Accept-Encoding": "gzip" })
+		self.assertEqual(response.status_code, 200)
+		response = self._serve({ "If-None-Match": "\"%s-gzip\"" % (etag), "Accept-Encoding": "gzip" })
+		self.assertEqual(response.status_code, 304)
@@ -62,3 +62,51 @@ class ESeriesTests(unittest.TestCase):
 
 		value = fractions.Fraction(3300000000000000000, 1)
 		self.assertEqual(eseries.closest(value).value, value)
+
+	def test_boundaries(self):
+		eseries = ESeries.standard(12)
+		self.assertEqual(eseries.smaller_larger(fractions.Fraction(33, 10**12)).smaller.value, fractions.Fraction(33, 10**12))
+		self.assertEqual(eseries.smaller_larger(fractions.Fraction(33, 10**12) - fractions.Fraction(1, 10**40)).larger.value, fractions.Fraction(33, 10**12))
+		self.assertEqual(eseries.smaller_larger(1e-12).smaller.value, fractions.Fraction(82, 10**14))
+		self.assertEqual(eseries.smaller_larger(fractions.Fraction(1, 10**12)).smaller.value, fractions.Fraction(1, 10**12))
+		self.assertEqual(eseries.smaller_larger(1000).smaller.value, 1000)
+		self.assertEqual(eseries.smaller_larger(999.9999).larger.value, 1000)
+
+	def test_many(self):
+		eseries = ESeries.standard(6)
+		values = [ 9999, 12345, 12501, 1.9e-9, fractions.Fraction(33, 10) ]
+		self.assertEqual(eseries.closest_many(values), [ eseries.closest(value) for value in values ])
+		self.assertEqual(eseries.smaller_larger_many(values), [ eseries.smaller_larger(value) for value in values ])
+		self.assertEqual([ match.value for match in eseries.closest_many(values) ], [ 10000, 10000, 15000, fractions.Fraction(22, 10**10), fractions.Fraction(33, 10) ])
+
+	def test_standard_singleton(self):
+		self.assertIs(ESeries.standard(24), ESeries.standard(24))
+		self.assertIsNot(ESeries.standard(24), ESeries.standard(12))
+
+	def test_table_edges(self):
+		eseries = ESeries.standard(3)
+		values = list(eseries.from_to(fractions.Fraction(1, 10**16), fractions.Fraction(10**13)))
+		self.assertEqual(len(values), 3 * 29)
+		self.assertEqual(values[0], fractions.Fraction(1, 10**16))
+		self.assertEqual(values[-1], fractions.Fraction(47 * 10**11))
+		self.assertTrue(all(x < y for (x, y) in zip(values, values[1:])))
+
+	def test_covering(self):
+		e24 = ESeries.standard(24)
+		self.assertEqual(e24.tolerance, fractions.Fraction(5, 100))
+		self.assertEqual([ match.value for match in e24.covering(1000) ], [ 1000 ])
+		self.assertEqual([ match.value for match in e24.covering(1050) ], [ 1000, 1100 ])
+		self.assertEqual([ match.value for match in e24.covering(1060) ], [ 1100 ])
+		self.assertEqual([ match.value for match in e24.covering(1060, tolerance = fractions.Fraction(1, 10)) ], [ 1000, 1100 ])
+		self.assertEqual(e24.covering(1050)[0].error, fractions.Fraction(-50, 1050))
+
+		e96 = ESeries.standard(96)
+		self.assertEqual([ match.value for match in e96.covering(4321) ], [ 4320 ])
+		self.assertEqual([ match.value for match in e96.covering(4370) ], [ ])
+		self.assertEqual(e96.covering_many([ 4321, 4370 ]), [ e96.covering(4321), e96.covering(4370) ])
+
+	def test_covering_custom(self):
+		eseries = ESeries([ 100, 500 ])
+		with self.assertRaises(Exception):
+			eseries.covering(100)
+		self.assertEqual([ match.value for match in eseries.covering(60, tolerance = 0.5) ], [ 50, 100 ])
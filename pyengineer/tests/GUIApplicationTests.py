@@ -0,0 +1,265 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import json
+import time
+import uuid
+import unittest
+import unittest.mock
+from pyengineer import GUIApplication
+from pyengineer.PluginWatcher import PluginWatcher
+from .PluginTestEnvironment import PluginTestEnvironment
+
+class GUIApplicationTests(unittest.TestCase):
+	_PLUGIN_ID = "5c7a1e2b-7f0e-4a5d-9c3b-2f0d4c1b8e6a"
+	_PLUGIN_SOURCE = """
+from pyengineer import BasePlugin
+
+class Plugin(BasePlugin):
+	_ID = "5c7a1e2b-7f0e-4a5d-9c3b-2f0d4c1b8e6a"
+	_TITLE = "Doubler"
+	_MENU_HIERARCHY = ("Tests", "Doubler")
+	_FORM_TEMPLATE = "<p>Doubler form</p>"
+	_CACHEABLE = True
+	calls = 0
+
+	def request(self, endpoint, parameters):
+		Plugin.calls += 1
+		if "count" in parameters:
+			return [ 2 * i for i in range(int(parameters["count"])) ]
+		x = int(parameters["x"])
+		if x < 0:
+			raise ValueError("Negative value: %d" % (x))
+		return x * 2
+"""
+
+	def setUp(self):
+		self._env = PluginTestEnvironment()
+		self._env.write_plugin("Doubler.py", self._PLUGIN_SOURCE)
+		self._gui_application = self._create_application()
+		self._client = self._gui_application.app.test_client()
+
+	def tearDown(self):
+		self._env.cleanup()
+
+	def _create_application(self, **options):
+		return GUIApplication(self._env.create_configuration(**options))
+
+	def _plugin_class(self):
+		return type(self._gui_application.menu[uuid.UUID(self._PLUGIN_ID)].instance)
+
+	def _post(self, path, data, accept = "application/json"):
+		response = self._client.post(path, data = json.dumps(data), content_type = "application/json", headers = { "Accept": accept })
+		self.assertEqual(response.status_code, 200)
+		return response
+
+	def test_request(self):
+		response = self._post("/plugins/%s/default" % (self._PLUGIN_ID), { "x": 21 })
+		self.assertEqual(response.json, { "status": "ok", "data": 42 })
+		response = self._post("/plugins/%s/default" % (self._PLUGIN_ID), { "x": -1 })
+		self.assertEqual(response.json["status"], "exception")
+		self.assertEqual(response.json["errorcode"], "ValueError")
+
+	def test_batch(self):
+		response = self._post("/plugins/%s/default/batch" % (self._PLUGIN_ID), [ { "x": 1 }, { "x": -1 }, { }, { "x": 3 } ])
+		self.assertEqual(response.mimetype, "application/json")
+		self.assertEqual(response.json["status"], "ok")
+		results = response.json["data"]
+		self.assertEqual(results[0], { "status": "ok", "data": 2 })
+		self.assertEqual((results[1]["status"], results[1]["errorcode"]), ("exception", "ValueError"))
+		self.assertEqual((results[2]["status"], results[2]["errorcode"]), ("exception", "KeyError"))
+		self.assertEqual(results[3], { "status": "ok", "data": 6 })
+
+		# Failing items are not re-run
+		self.assertEqual(self._plugin_class().calls, 4)
+
+	def test_batch_not_a_list(self):
+		response = self._post("/plugins/%s/default/batch" % (self._PLUGIN_ID), { "x": 1 })
+		self.assertEqual(response.mimetype, "application/json")
+		self.assertEqual(response.json["errorcode"], "JSONInputNotAList")
+
+	def test_batch_bypasses_cache(self):
+		self._post("/plugins/%s/default" % (self._PLUGIN_ID), { "x": 1 })
+		self.assertEqual(len(self._gui_application.response_cache), 1)
+		self._post("/plugins/%s/default/batch" % (self._PLUGIN_ID), [ { "x": 1 }, { "x": 2 } ])
+		self.assertEqual(len(self._gui_application.response_cache), 1)
+		self.assertEqual(self._plugin_class().calls, 3)
+
+	def test_response_cache(self):
+		for i in range(3):
+			response = self._post("/plugins/%s/default" % (self._PLUGIN_ID), { "x": 5 })
+			self.assertEqual(response.json["data"], 10)
+		self.assertEqual(self._plugin_class().calls, 1)
+		self.assertEqual(self._gui_application.response_cache.hits, 2)
+
+	def _stream(self, data, query = ""):
+		response = self._post("/plugins/%s/default%s" % (self._PLUGIN_ID, query), data, accept = "application/x-ndjson")
+		self.assertEqual(response.mimetype, "application/x-ndjson")
+		return [ json.loads(line) for line in response.get_data(as_text = True).splitlines() ]
+
+	def test_stream(self):
+		self.assertEqual(self._stream({ "count": 3 }), [ { "status": "ok", "data": value } for value in [ 0, 2, 4 ] ])
+		self.assertEqual(self._stream({ "x": 4 }), [ { "status": "ok", "data": 8 } ])
+		self.assertEqual(self._stream({ "count": 0 }), [ ])
+
+	def test_stream_limit(self):
+		self.assertEqual(self._stream({ "count": 5 }, "?limit=2"), [ { "status": "ok", "data": value } for value in [ 0, 2 ] ])
+		for limit in [ "0", "-1", "abc", "1.5" ]:
+			lines = self._stream({ "count": 5 }, "?limit=" + limit)
+			self.assertEqual(len(lines), 1)
+			self.assertEqual((lines[0]["status"], lines[0]["errorcode"]), ("failed", "InvalidLimit"))
+
+	def test_stream_exception(self):
+		lines = self._stream({ "x": -1 })
+		self.assertEqual(len(lines), 1)
+		self.assertEqual((lines[0]["status"], lines[0]["errorcode"]), ("exception", "ValueError"))
+
+	def test_stream_time_budget(self):
+		self._env.write_plugin("Sleeper.py", """
+import time
+from pyengineer import BasePlugin
+
+class Plugin(BasePlugin):
+	_ID = "3e9f1a7c-0b2d-4c6e-8f1a-5d7b9c2e4f60"
+	_TITLE = "Sleeper"
+	_MENU_HIERARCHY = ("Tests", "Sleeper")
+	_FORM_TEMPLATE = ""
+	_CPU_INTENSIVE = True
+
+	def request(self, endpoint, parameters):
+		time.sleep(parameters["sleep"])
+		return [ 1, 2, 3 ]
+""")
+		gui_application = self._create_application(request_pool = { "workers": 1, "timeout": 0.5 })
+		try:
+			client = gui_application.app.test_client()
+			response = client.post("/plugins/3e9f1a7c-0b2d-4c6e-8f1a-5d7b9c2e4f60/default", data = json.dumps({ "sleep": 30 }), content_type = "application/json", headers = { "Accept": "application/x-ndjson" })
+			lines = [ json.loads(line) for line in response.get_data(as_text = True).splitlines() ]
+			self.assertEqual(len(lines), 1)
+			self.assertEqual((lines[0]["status"], lines[0]["errorcode"]), ("exception", "RequestTimeoutException"))
+
+			response = client.post("/plugins/3e9f1a7c-0b2d-4c6e-8f1a-5d7b9c2e4f60/default", data = json.dumps({ "sleep": 0 }), content_type = "application/json", headers = { "Accept": "application/x-ndjson" })
+			lines = [ json.loads(line) for line in response.get_data(as_text = True).splitlines() ]
+			self.assertEqual([ line["data"] for line in lines ], [ 1, 2, 3 ])
+		finally:
+			gui_application.request_pool.shutdown()
+
+	def test_pages_served_from_memory(self):
+		with unittest.mock.patch.object(self._gui_application, "_serve", wraps = self._gui_application._serve) as serve:
+			responses = [ self._client.get("/") for i in range(2) ]
+			self.assertEqual(serve.call_count, 0)
+			self.assertIn(b"Doubler", responses[0].get_data())
+			self.assertEqual(responses[0].get_data(), responses[1].get_data())
+
+			responses = [ self._client.get("/plugins/%s" % (self._PLUGIN_ID)) for i in range(2) ]
+			self.assertEqual(serve.call_count, 1)
+			self.assertIn(b"Doubler form", responses[0].get_data())
+			self.assertEqual(responses[0].get_data(), responses[1].get_data())
+
+		(etag, weak) = responses[0].get_etag()
+		response = self._client.get("/plugins/%s" % (self._PLUGIN_ID), headers = { "If-None-Match": "\"%s\"" % (etag) })
+		self.assertEqual(response.status_code, 304)
+
+	def test_pages_rebuilt_after_reload(self):
+		self._client.get("/plugins/%s" % (self._PLUGIN_ID))
+		filename = self._env.write_plugin("Doubler.py", self._PLUGIN_SOURCE.replace("Doubler", "Tripler"))
+		self._gui_application.reload_plugins([ filename ])
+
+		response = self._client.get("/")
+		self.assertIn(b"Tripler", response.get_data())
+		self.assertNotIn(b"Doubler", response.get_data())
+		response = self._client.get("/plugins/%s" % (self._PLUGIN_ID))
+		self.assertIn(b"Tripler form", response.get_data())
+
+	_OTHER_PLUGIN_ID = "8d2f4b6a-1c3e-4a5b-9d7f-0e2c4a6b8d1f"
+
+	def _write_other_plugin(self, plugin_id = None):
+		source = self._PLUGIN_SOURCE.replace("Doubler", "Other").replace(self._PLUGIN_ID, plugin_id or self._OTHER_PLUGIN_ID)
+		return self._env.write_plugin("Other.py", source)
+
+	def test_reload_swaps_menu(self):
+		old_menu = self._gui_application.menu
+		old_instance = old_menu[uuid.UUID(self._PLUGIN_ID)]
+		filename = self._env.write_plugin("Doubler.py", self._PLUGIN_SOURCE.replace("x * 2", "x * 3"))
+		self._gui_application.reload_plugins([ filename ])
+
+		# The menu in use is replaced, not modified
+		self.assertIsNot(self._gui_application.menu, old_menu)
+		self.assertIs(old_menu[uuid.UUID(self._PLUGIN_ID)], old_instance)
+		response = self._post("/plugins/%s/default" % (self._PLUGIN_ID), { "x": 2 })
+		self.assertEqual(response.json["data"], 6)
+
+	def test_reload_added_and_removed(self):
+		filename = self._write_other_plugin()
+		self._gui_application.reload_plugins([ filename ])
+		self.assertIn(uuid.UUID(self._OTHER_PLUGIN_ID), dict(self._gui_application.menu.items()))
+		self.assertIn(b"Other", self._client.get("/").get_data())
+
+		os.unlink(filename)
+		self._gui_application.reload_plugins([ filename ])
+		self.assertNotIn(uuid.UUID(self._OTHER_PLUGIN_ID), dict(self._gui_application.menu.items()))
+		self.assertIn(uuid.UUID(self._PLUGIN_ID), dict(self._gui_application.menu.items()))
+		self.assertNotIn(b"Other", self._client.get("/").get_data())
+
+	def test_reload_duplicate_keeps_menu(self):
+		old_menu = self._gui_application.menu
+		filename = self._write_other_plugin(plugin_id = self._PLUGIN_ID)
+		self._gui_application.reload_plugins([ filename ])
+		self.assertIs(self._gui_application.menu, old_menu)
+		response = self._post("/plugins/%s/default" % (self._PLUGIN_ID), { "x": 2 })
+		self.assertEqual(response.json["data"], 4)
+
+	def test_reload_discards_cached_responses(self):
+		self._write_other_plugin()
+		gui_application = self._create_application(shared_cache = { "filename": os.path.join(self._env.directory, "cache.sqlite3") })
+		client = gui_application.app.test_client()
+		for plugin_id in [ self._PLUGIN_ID, self._OTHER_PLUGIN_ID ]:
+			for x in range(3):
+				client.post("/plugins/%s/default" % (plugin_id), data = json.dumps({ "x": x }), content_type = "application/json", headers = { "Accept": "application/json" })
+		self.assertEqual(len(gui_application.response_cache), 6)
+		self.assertEqual(len(gui_application.shared_cache), 6)
+
+		filename = self._env.write_plugin("Doubler.py", self._PLUGIN_SOURCE.replace("x * 2", "x * 3"))
+		gui_application.reload_plugins([ filename ])
+		self.assertEqual(len(gui_application.response_cache), 3)
+		self.assertEqual(len(gui_application.shared_cache), 3)
+
+		# Responses of the unchanged plugin are still served from the cache
+		hits = gui_application.response_cache.hits
+		client.post("/plugins/%s/default" % (self._OTHER_PLUGIN_ID), data = json.dumps({ "x": 0 }), content_type = "application/json", headers = { "Accept": "application/json" })
+		self.assertEqual(gui_application.response_cache.hits, hits + 1)
+
+	def test_watch_survives_errors(self):
+		filename = self._env.write_plugin("Doubler.py", self._PLUGIN_SOURCE.replace("x * 2", "x * 3"))
+		results = [ OSError("Plugin directory vanished"), { filename } ]
+		def poll():
+			return results.pop(0) if (len(results) > 0) else set()
+
+		old_menu = self._gui_application.menu
+		with unittest.mock.patch.object(PluginWatcher, "poll", side_effect = poll), unittest.mock.patch("builtins.print"):
+			self._gui_application.watch_plugins(interval = 0.01)
+			deadline = time.time() + 10
+			while (self._gui_application.menu is old_menu) and (time.time() < deadline):
+				time.sleep(0.01)
+		self.assertIsNot(self._gui_application.menu, old_menu)
+		response = self._post("/plugins/%s/default" % (self._PLUGIN_ID), { "x": 2 })
+		self.assertEqual(response.json["data"], 6)
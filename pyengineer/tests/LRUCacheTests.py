@@ -0,0 +1,83 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import unittest
+from pyengineer.LRUCache import LRUCache
+
+class LRUCacheTests(unittest.TestCase):
+	def test_get_put(self):
+		cache = LRUCache(maxsize = 10)
+		self.assertEqual(cache.get("foo"), None)
+		self.assertEqual(cache.get("foo", 123), 123)
+		cache.put("foo", "bar")
+		self.assertEqual(cache.get("foo"), "bar")
+		self.assertIn("foo", cache)
+		self.assertEqual(cache.hits, 1)
+		self.assertEqual(cache.misses, 2)
+
+	def test_eviction(self):
+		cache = LRUCache(maxsize = 3)
+		for i in range(3):
+			cache.put(i, i)
+		self.assertEqual(cache.get(0), 0)
+		cache.put(3, 3)
+		self.assertEqual(len(cache), 3)
+		self.assertNotIn(1, cache)
+		self.assertIn(0, cache)
+		self.assertIn(2, cache)
+		self.assertIn(3, cache)
+
+	def test_clear(self):
+		cache = LRUCache(maxsize = 3)
+		cache.put(1, 1)
+		cache.clear()
+		self.assertEqual(len(cache), 0)
+		self.assertEqual(cache.to_dict(), { "size": 0, "maxsize": 3, "total_size": 0, "max_total_size": None, "hits": 0, "misses": 0 })
+
+	def test_discard_prefix(self):
+		cache = LRUCache(maxsize = 5)
+		cache.put("foo/1", 1)
+		cache.put("foo/2", 2)
+		cache.put("bar/1", 3)
+		cache.discard_prefix("foo/")
+		self.assertEqual(len(cache), 1)
+		self.assertIn("bar/1", cache)
+
+	def test_total_size(self):
+		cache = LRUCache(maxsize = 10, max_total_size = 10, max_entry_size = 6)
+		self.assertTrue(cache.put("a", "xxxx"))
+		self.assertTrue(cache.put("b", "xxxx"))
+		self.assertEqual(cache.total_size, 8)
+		self.assertTrue(cache.put("c", "xxxx"))
+		self.assertNotIn("a", cache)
+		self.assertEqual(cache.total_size, 8)
+
+		# Replacing an entry accounts for the old size
+		self.assertTrue(cache.put("c", "xx"))
+		self.assertEqual(cache.total_size, 6)
+
+		# Oversized entries are never cached and do not evict anything
+		self.assertFalse(cache.put("d", "xxxxxxx"))
+		self.assertNotIn("d", cache)
+		self.assertEqual(len(cache), 2)
+
+		cache.discard_prefix("b")
+		self.assertEqual(cache.total_size, 2)
@@ -0,0 +1,103 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import time
+import tempfile
+import unittest
+from pyengineer import LocalTemplateLookup
+
+class LocalTemplateLookupTests(unittest.TestCase):
+	def setUp(self):
+		self._tempdir = tempfile.TemporaryDirectory()
+		self._module_directory = os.path.join(self._tempdir.name, "cache")
+
+	def tearDown(self):
+		self._tempdir.cleanup()
+
+	def _source_files(self):
+		return sorted(os.listdir(os.path.join(self._module_directory, "source")))
+
+	def test_in_memory(self):
+		lookup = LocalTemplateLookup()
+		self.assertIsNone(lookup.module_directory)
+		template = lookup.create("Hello ${name}")
+		self.assertIs(lookup.create("Hello ${name}"), template)
+		self.assertEqual(template.render(name = "foo"), "Hello foo")
+		self.assertFalse(os.path.exists(self._module_directory))
+
+	def _backdate(self, filename, seconds):
+		full_filename = os.path.join(self._module_directory, "source", filename)
+		os.utime(full_filename, (time.time() - seconds, time.time() - seconds))
+		return full_filename
+
+	def test_disk_cache(self):
+		lookup = LocalTemplateLookup(module_directory = self._module_directory)
+		self.assertEqual(lookup.create("Hello ${name}").render(name = "foo"), "Hello foo")
+		files = self._source_files()
+		self.assertEqual(len(files), 2)
+		self.assertTrue(files[0].endswith(".html"))
+		self.assertEqual(files[1], files[0] + ".py")
+
+		# Another instance (e.g., after a restart) reuses the compiled module;
+		# it is marked so that a recompilation would be noticed
+		self._backdate(files[0], 7200)
+		module_filename = self._backdate(files[1], 3600)
+		with open(module_filename, "a") as f:
+			f.write("# Not recompiled\n")
+		self._backdate(files[1], 3600)
+		lookup = LocalTemplateLookup(module_directory = self._module_directory)
+		self.assertEqual(lookup.create("Hello ${name}").render(name = "bar"), "Hello bar")
+		self.assertEqual(self._source_files(), files)
+		with open(module_filename) as f:
+			self.assertTrue(f.read().endswith("# Not recompiled\n"))
+
+		# Using the template marks the module, never the source, as used
+		self.assertGreater(os.stat(module_filename).st_mtime, time.time() - 60)
+		self.assertLess(os.stat(os.path.join(self._module_directory, "source", files[0])).st_mtime, time.time() - 3600)
+
+	def test_prune(self):
+		lookup = LocalTemplateLookup(module_directory = self._module_directory)
+		lookup.create("Old ${name}").render(name = "foo")
+		old_files = self._source_files()
+		for filename in old_files:
+			self._backdate(filename, 86400)
+		lookup.create("New ${name}").render(name = "foo")
+		orphan_filename = os.path.join(self._module_directory, "source", "0" * 64 + ".html.py")
+		with open(orphan_filename, "w") as f:
+			pass
+		self.assertEqual(len(self._source_files()), 5)
+
+		LocalTemplateLookup(module_directory = self._module_directory, max_age = 3600)
+		files = self._source_files()
+		self.assertEqual(len(files), 2)
+		self.assertFalse(any(filename in old_files for filename in files))
+
+	def test_used_templates_not_pruned(self):
+		LocalTemplateLookup(module_directory = self._module_directory).create("Foo ${name}")
+		files = self._source_files()
+		for filename in files:
+			self._backdate(filename, 86400)
+
+		# Creating the template again marks it as used
+		LocalTemplateLookup(module_directory = self._module_directory, max_age = None).create("Foo ${name}")
+		LocalTemplateLookup(module_directory = self._module_directory, max_age = 3600)
+		self.assertEqual(self._source_files(), files)
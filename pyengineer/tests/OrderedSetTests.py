@@ -0,0 +1,58 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import unittest
+from pyengineer import OrderedSet
+
+class OrderedSetTests(unittest.TestCase):
+	def test_empty(self):
+		oset = OrderedSet()
+		self.assertEqual(len(oset), 0)
+		self.assertEqual(oset.ordered_tuple, tuple())
+		self.assertEqual(oset.sorted_tuple, tuple())
+		self.assertEqual(list(oset), [ ])
+
+	def test_add_items(self):
+		oset = OrderedSet()
+		oset.add_items([ 5, 3, 9, 3, 1 ])
+		oset.add_item(4)
+		oset.add_item(9)
+		oset.add_items([ 8, 2, 5 ])
+		self.assertEqual(len(oset), 7)
+		self.assertEqual(oset.ordered_tuple, (5, 3, 9, 1, 4, 8, 2))
+		self.assertEqual(oset.sorted_tuple, (1, 2, 3, 4, 5, 8, 9))
+		self.assertEqual(list(oset), [ 1, 2, 3, 4, 5, 8, 9 ])
+		self.assertEqual(oset[0], 1)
+		self.assertEqual(oset[-1], 9)
+
+	def test_add_sorted_items(self):
+		oset = OrderedSet()
+		oset.add_items([ 10, 30, 50 ])
+		oset.add_sorted_items([ 5, 10, 20, 20, 60 ])
+		self.assertEqual(oset.ordered_tuple, (10, 30, 50, 5, 20, 60))
+		self.assertEqual(oset.sorted_tuple, (5, 10, 20, 30, 50, 60))
+
+	def test_iterate_while_adding(self):
+		oset = OrderedSet()
+		oset.add_items([ 1, 2, 3 ])
+		for item in oset:
+			oset.add_item(item + 10)
+		self.assertEqual(oset.sorted_tuple, (1, 2, 3, 11, 12, 13))
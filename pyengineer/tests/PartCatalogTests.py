@@ -0,0 +1,130 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import json
+import math
+import tempfile
+import unittest
+from pyengineer import PartCatalog, Configuration
+from pyengineer.ValueSets import ValueSets
+from pyengineer.Exceptions import InvalidDataException
+
+class PartCatalogTests(unittest.TestCase):
+	_CSV_DATA = "\n".join([
+		"part_number,value,tolerance,power,package",
+		"RC0805-10K,10k,1%,125m,0805",
+		"RC0603-4K7,4.7k,5%,100m,0603",
+		"RC0805-4K7,4.7k,1%,125m,0805",
+		"MF-1K,1k,0.01,,THT",
+		"RC0805-10K-B,10k,0.1%,125m,0805",
+	]) + "\n"
+
+	def setUp(self):
+		self._tempdir = tempfile.TemporaryDirectory()
+		self._csv_filename = os.path.join(self._tempdir.name, "parts.csv")
+		with open(self._csv_filename, "w") as f:
+			f.write(self._CSV_DATA)
+
+	def tearDown(self):
+		self._tempdir.cleanup()
+
+	def _assert_catalog(self, catalog):
+		self.assertEqual(len(catalog), 5)
+		self.assertEqual(list(catalog.unique_values), [ 1e3, 4.7e3, 10e3 ])
+		parts = list(catalog.parts_with_value(4700))
+		self.assertEqual(sorted(part.part_number for part in parts), [ "RC0603-4K7", "RC0805-4K7" ])
+		(part, ) = catalog.parts_with_value(1000)
+		self.assertEqual(part.part_number, "MF-1K")
+		self.assertAlmostEqual(part.tolerance, 0.01)
+		self.assertTrue(math.isnan(part.power))
+		self.assertEqual(part.package, "THT")
+		self.assertEqual([ part.value for part in catalog ], [ 1e3, 4.7e3, 4.7e3, 10e3, 10e3 ])
+
+	def test_csv(self):
+		self._assert_catalog(PartCatalog.load(self._csv_filename))
+
+	def test_binary(self):
+		binary_filename = os.path.join(self._tempdir.name, "parts.bin")
+		PartCatalog.load_csv(self._csv_filename).write_binary(binary_filename)
+		self._assert_catalog(PartCatalog.load(binary_filename))
+
+	def test_binary_invalid(self):
+		binary_filename = os.path.join(self._tempdir.name, "parts.bin")
+		with open(binary_filename, "wb") as f:
+			f.write(b"foobar" * 10)
+		with self.assertRaises(InvalidDataException):
+			PartCatalog.load_binary(binary_filename)
+
+	def test_csv_invalid(self):
+		with open(self._csv_filename, "a") as f:
+			f.write("FOO,10x,,,\n")
+		with self.assertRaises(InvalidDataException):
+			PartCatalog.load_csv(self._csv_filename)
+
+	def test_valueset(self):
+		data = [
+			{
+				"name":		"stock",
+				"type":		"catalog",
+				"filename":	self._csv_filename,
+			},
+			{
+				"name":		"more",
+				"type":		"explicit",
+				"items":	[ "2.2k", "10k" ],
+			},
+			{
+				"name":		"all",
+				"type":		"union",
+				"groups":	[ "stock", "more" ],
+			},
+		]
+		sets = ValueSets.from_dict(data)
+		self.assertEqual([ float(x) for x in sets["stock"] ], [ 1e3, 4.7e3, 10e3 ])
+		self.assertEqual(len(sets["stock"].catalog), 5)
+		self.assertEqual([ float(x) for x in sets["all"] ], [ 1e3, 2.2e3, 4.7e3, 10e3 ])
+		self.assertEqual(sets["stock"].find_closest(5000), (sets["stock"][1], sets["stock"][2]))
+
+	def test_valueset_relative_filename(self):
+		data = [ { "name": "stock", "type": "catalog", "filename": "parts.csv" } ]
+		sets = ValueSets.from_dict(data, base_directory = self._tempdir.name)
+		self.assertEqual([ float(x) for x in sets["stock"] ], [ 1e3, 4.7e3, 10e3 ])
+		self.assertIs(sets["stock"].float_index, sets["stock"].catalog.unique_values)
+
+	def test_configuration_relative_filename(self):
+		config_filename = os.path.join(self._tempdir.name, "configuration.json")
+		with open(config_filename, "w") as f:
+			json.dump({ "valuesets": { "r": [ { "name": "stock", "type": "catalog", "filename": "parts.csv" } ] } }, f)
+		config = Configuration(config_filename)
+		self.assertEqual(len(config.get_valuesets("r")["stock"]), 3)
+
+	def test_configuration_version(self):
+		config_filename = os.path.join(self._tempdir.name, "configuration.json")
+		with open(config_filename, "w") as f:
+			json.dump({ "valuesets": { "r": [ { "name": "stock", "type": "catalog", "filename": "parts.csv" } ] } }, f)
+		version = Configuration(config_filename).version
+		self.assertEqual(Configuration(config_filename).version, version)
+
+		# Updating the catalog changes the version of the unchanged configuration
+		with open(self._csv_filename, "a") as f:
+			f.write("RC0805-22K,22k,1%,125m,0805\n")
+		self.assertNotEqual(Configuration(config_filename).version, version)
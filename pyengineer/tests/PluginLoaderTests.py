@@ -0,0 +1,146 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import uuid
+import unittest
+from pyengineer.PluginLoader import PluginLoader
+from pyengineer.LazyPlugin import LazyPlugin
+from pyengineer.Exceptions import PluginLoadException
+from .PluginTestEnvironment import PluginTestEnvironment
+
+class PluginLoaderTests(unittest.TestCase):
+	def setUp(self):
+		self._env = PluginTestEnvironment()
+
+	def tearDown(self):
+		self._env.cleanup()
+
+	def _write_plugin(self, source):
+		return self._env.write_plugin("plugin.py", source)
+
+	def test_read_manifest(self):
+		filename = self._write_plugin("""
+from pyengineer import BasePlugin
+
+class Plugin(BasePlugin):
+	_ID = "0d1a0c8e-5bde-4b27-9a0e-0bb3f6b1f6a2"
+	_TITLE = "Foo"
+	_MENU_HIERARCHY = ("Bar", "Foo")
+
+	def request(self, endpoint, parameters):
+		raise NotImplementedError()
+""")
+		manifest = PluginLoader.read_manifest(filename)
+		self.assertEqual(manifest.filename, filename)
+		self.assertEqual(manifest.plugin_id, uuid.UUID("0d1a0c8e-5bde-4b27-9a0e-0bb3f6b1f6a2"))
+		self.assertEqual(manifest.title, "Foo")
+		self.assertEqual(manifest.menu_hierarchy, ("Bar", "Foo"))
+
+	def test_read_manifest_not_literal(self):
+		filename = self._write_plugin("""
+from pyengineer import BasePlugin
+
+class Plugin(BasePlugin):
+	_ID = "0d1a0c8e-5bde-4b27-9a0e-0bb3f6b1f6a2"
+	_TITLE = "Foo".upper()
+	_MENU_HIERARCHY = ("Bar", "Foo")
+""")
+		self.assertEqual(PluginLoader.read_manifest(filename), None)
+
+	def test_read_manifest_no_plugin(self):
+		filename = self._write_plugin("""
+class Helper(object):
+	_ID = "0d1a0c8e-5bde-4b27-9a0e-0bb3f6b1f6a2"
+""")
+		self.assertEqual(PluginLoader.read_manifest(filename), None)
+
+	def test_source_hash(self):
+		source = """
+from pyengineer import BasePlugin
+
+class Plugin(BasePlugin):
+	_ID = "0d1a0c8e-5bde-4b27-9a0e-0bb3f6b1f6a2"
+	_TITLE = "Foo"
+	_MENU_HIERARCHY = ("Bar", "Foo")
+	_FORM_TEMPLATE = ""
+"""
+		filename = self._write_plugin(source)
+		manifest = PluginLoader.read_manifest(filename)
+		plugin = self._env.create_loader().load_plugin(filename)
+		self.assertEqual(plugin.plugin_source_hash, manifest.source_hash)
+
+		self._write_plugin(source + "# Changed\n")
+		self.assertNotEqual(PluginLoader.read_manifest(filename).source_hash, manifest.source_hash)
+
+	def test_lazy_plugin(self):
+		self._write_plugin("""
+from pyengineer import BasePlugin
+
+class Plugin(BasePlugin):
+	_ID = "0d1a0c8e-5bde-4b27-9a0e-0bb3f6b1f6a2"
+	_TITLE = "Foo"
+	_MENU_HIERARCHY = ("Bar", "Foo")
+	_FORM_TEMPLATE = "Form of ${title}"
+
+	def request(self, endpoint, parameters):
+		return parameters["x"] + 1
+""")
+		[ plugin ] = list(self._env.create_loader().load_plugins_lazily())
+		self.assertIsInstance(plugin, LazyPlugin)
+		self.assertEqual(plugin.plugin_id, uuid.UUID("0d1a0c8e-5bde-4b27-9a0e-0bb3f6b1f6a2"))
+		self.assertEqual(plugin.plugin_title, "Foo")
+		self.assertEqual(plugin.plugin_menu_hierarchy, ("Bar", "Foo"))
+		self.assertFalse(plugin.loaded)
+
+		self.assertEqual(plugin.request("default", { "x": 1 }), 2)
+		self.assertTrue(plugin.loaded)
+		self.assertEqual(plugin.rendered_form_html.strip(), "Form of Foo")
+		self.assertIs(plugin.instance, plugin.instance)
+		with self.assertRaises(AttributeError):
+			plugin._private
+
+	def test_lazy_plugin_broken(self):
+		filename = self._write_plugin("""
+import pyengineer_nonexistent_module
+from pyengineer import BasePlugin
+
+class Plugin(BasePlugin):
+	_ID = "0d1a0c8e-5bde-4b27-9a0e-0bb3f6b1f6a2"
+	_TITLE = "Foo"
+	_MENU_HIERARCHY = ("Bar", "Foo")
+""")
+		[ plugin ] = list(self._env.create_loader().load_plugins_lazily())
+		self.assertEqual(plugin.plugin_title, "Foo")
+		with self.assertRaises(PluginLoadException) as context:
+			plugin.request("default", { })
+		self.assertIn(filename, str(context.exception))
+		self.assertIn("pyengineer_nonexistent_module", str(context.exception))
+		self.assertFalse(plugin.loaded)
+
+	def test_syntax_error_at_startup(self):
+		self._write_plugin("""
+class Plugin(BasePlugin):
+	_ID = "0d1a0c8e-5bde-4b27-9a0e-0bb3f6b1f6a2"
+	_TITLE = "Foo"
+	_MENU_HIERARCHY = ("Bar", "Foo"
+""")
+		with self.assertRaises(SyntaxError):
+			list(self._env.create_loader().load_plugins_lazily())
@@ -0,0 +1,147 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import uuid
+import time
+import types
+import unittest
+from pyengineer.PluginProcessPool import PluginProcessPool
+from pyengineer.Exceptions import RequestTimeoutException, WorkerCrashedException, PluginLoadException
+from .PluginTestEnvironment import PluginTestEnvironment
+
+class PluginProcessPoolTests(unittest.TestCase):
+	_PLUGIN_SOURCE = """
+import os
+import time
+from pyengineer import BasePlugin
+
+class Plugin(BasePlugin):
+	_ID = "9b0e3c1d-2a4f-4e8b-8c6d-1f3a5b7c9d0e"
+	_TITLE = "Worker"
+	_MENU_HIERARCHY = ("Tests", "Worker")
+	_FORM_TEMPLATE = ""
+	_CPU_INTENSIVE = True
+
+	def request(self, endpoint, parameters):
+		if "sleep" in parameters:
+			time.sleep(parameters["sleep"])
+		if "crash" in parameters:
+			os._exit(1)
+		if "fail" in parameters:
+			raise ValueError(parameters["fail"])
+		if "count" in parameters:
+			return list(range(parameters["count"]))
+		return os.getpid()
+"""
+
+	def setUp(self):
+		self._env = PluginTestEnvironment()
+		plugin_filename = self._env.write_plugin("Worker.py", self._PLUGIN_SOURCE)
+		self._plugin = self._env.create_loader().load_plugin(plugin_filename)
+		self._pools = [ ]
+
+	def tearDown(self):
+		for pool in self._pools:
+			pool.shutdown()
+		self._env.cleanup()
+
+	def _create_pool(self, **kwargs):
+		pool = PluginProcessPool(self._env.config_filename, max_workers = 1, **kwargs)
+		self._pools.append(pool)
+		return pool
+
+	def test_request(self):
+		pool = self._create_pool()
+		pid = pool.request(self._plugin, "default", { })
+		self.assertNotEqual(pid, os.getpid())
+		self.assertEqual(pool.request(self._plugin, "default", { }), pid)
+		with self.assertRaises(ValueError):
+			pool.request(self._plugin, "default", { "fail": "foo" })
+		self.assertEqual(pool.request(self._plugin, "default", { }), pid)
+
+	def test_batch(self):
+		pool = self._create_pool()
+		results = pool.request_batch(self._plugin, "default", [ { "count": 2 }, { "fail": "foo" } ])
+		self.assertEqual(results[0], (True, [ 0, 1 ]))
+		self.assertFalse(results[1][0])
+		self.assertIsInstance(results[1][1], ValueError)
+
+	def test_stream(self):
+		pool = self._create_pool()
+		self.assertEqual(pool.request_stream(self._plugin, "default", { "count": 5 }), [ 0, 1, 2, 3, 4 ])
+		self.assertEqual(pool.request_stream(self._plugin, "default", { "count": 5 }, limit = 2), [ 0, 1 ])
+
+	def test_timeout_replaces_worker(self):
+		pool = self._create_pool(timeout = 0.5)
+		pid = pool.request(self._plugin, "default", { })
+		[ worker ] = pool.workers
+		t0 = time.time()
+		with self.assertRaises(RequestTimeoutException):
+			pool.request(self._plugin, "default", { "sleep": 30 })
+		self.assertLess(time.time() - t0, 10)
+		self.assertNotIn(worker, pool.workers)
+		self.assertFalse(worker._process.is_alive())
+		self.assertNotEqual(pool.request(self._plugin, "default", { }), pid)
+
+	def test_stream_timeout(self):
+		pool = self._create_pool(timeout = 0.5)
+		with self.assertRaises(RequestTimeoutException):
+			pool.request_stream(self._plugin, "default", { "sleep": 30 })
+
+	def test_batch_timeout_capped(self):
+		pool = self._create_pool(timeout = 10, max_batch_timeout = 0.5)
+		t0 = time.time()
+		with self.assertRaises(RequestTimeoutException):
+			pool.request_batch(self._plugin, "default", [ { "sleep": 30 } ] * 3)
+		self.assertLess(time.time() - t0, 10)
+
+	def test_crash_replaces_worker(self):
+		pool = self._create_pool()
+		pid = pool.request(self._plugin, "default", { })
+		with self.assertRaises(WorkerCrashedException):
+			pool.request(self._plugin, "default", { "crash": True })
+		self.assertNotEqual(pool.request(self._plugin, "default", { }), pid)
+
+	def test_broken_plugin(self):
+		self._env.write_plugin("Broken.py", """
+import pyengineer_nonexistent_module
+from pyengineer import BasePlugin
+
+class Plugin(BasePlugin):
+	_ID = "6a8c0e2f-4b1d-4f3a-9e5c-7d9f1b3a5c7e"
+	_TITLE = "Broken"
+	_MENU_HIERARCHY = ("Tests", "Broken")
+""")
+		pool = self._create_pool()
+		pid = pool.request(self._plugin, "default", { })
+		broken_plugin = types.SimpleNamespace(plugin_id = uuid.UUID("6a8c0e2f-4b1d-4f3a-9e5c-7d9f1b3a5c7e"), plugin_title = "Broken", plugin_request_timeout = None)
+		with self.assertRaises(PluginLoadException):
+			pool.request(broken_plugin, "default", { })
+		self.assertEqual(pool.request(self._plugin, "default", { }), pid)
+
+	def test_startup_timeout(self):
+		self._env.write_plugin("Hang.py", "import time\ntime.sleep(30)\n")
+		pool = self._create_pool(startup_timeout = 0.5)
+		t0 = time.time()
+		with self.assertRaises(WorkerCrashedException):
+			pool.request(self._plugin, "default", { })
+		self.assertLess(time.time() - t0, 10)
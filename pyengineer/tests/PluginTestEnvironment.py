@@ -0,0 +1,73 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import json
+import tempfile
+from pyengineer import Configuration
+from pyengineer.PluginLoader import PluginLoader
+
+class PluginTestEnvironment(object):
+	"""Temporary directory with a plugin directory and a configuration file
+	pointing to it, for tests that load actual plugins."""
+	def __init__(self):
+		self._tempdir = tempfile.TemporaryDirectory()
+		self._plugin_directory = os.path.join(self._tempdir.name, "plugins")
+		os.mkdir(self._plugin_directory)
+		self._config_filename = os.path.join(self._tempdir.name, "configuration.json")
+		self.write_configuration()
+
+	@property
+	def directory(self):
+		return self._tempdir.name
+
+	@property
+	def plugin_directory(self):
+		return self._plugin_directory
+
+	@property
+	def config_filename(self):
+		return self._config_filename
+
+	def write_plugin(self, filename, source):
+		filename = os.path.join(self._plugin_directory, filename)
+		with open(filename, "w") as f:
+			f.write(source)
+		return filename
+
+	def write_configuration(self, **options):
+		config_data = {
+			"valuesets":		{ },
+			"plugin_directory":	self._plugin_directory,
+		}
+		config_data.update(options)
+		with open(self._config_filename, "w") as f:
+			json.dump(config_data, f)
+		return self._config_filename
+
+	def create_configuration(self, **options):
+		return Configuration(self.write_configuration(**options))
+
+	def create_loader(self, **options):
+		return PluginLoader(self.create_configuration(**options))
+
+	def cleanup(self):
+		self._tempdir.cleanup()
@@ -0,0 +1,61 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import tempfile
+import unittest
+from pyengineer.PluginWatcher import PluginWatcher
+
+class _DirectoryLoader(object):
+	def __init__(self, directory):
+		self._directory = directory
+
+	def iter_plugin_filenames(self):
+		for filename in os.listdir(self._directory):
+			yield os.path.join(self._directory, filename)
+
+class PluginWatcherTests(unittest.TestCase):
+	def setUp(self):
+		self._tempdir = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		self._tempdir.cleanup()
+
+	def _write(self, name, content, mtime):
+		filename = os.path.join(self._tempdir.name, name)
+		with open(filename, "w") as f:
+			f.write(content)
+		os.utime(filename, (mtime, mtime))
+		return filename
+
+	def test_poll(self):
+		foo = self._write("foo.py", "foo", 1000)
+		bar = self._write("bar.py", "bar", 1000)
+		watcher = PluginWatcher(_DirectoryLoader(self._tempdir.name))
+		self.assertEqual(watcher.poll(), set())
+
+		self._write("foo.py", "foo", 2000)
+		self.assertEqual(watcher.poll(), set([ foo ]))
+		self.assertEqual(watcher.poll(), set())
+
+		os.unlink(bar)
+		baz = self._write("baz.py", "baz", 1000)
+		self.assertEqual(watcher.poll(), set([ bar, baz ]))
@@ -0,0 +1,101 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import random
+import unittest
+import threading
+from pyengineer.ResistorNetworkSynthesis import ResistorNetworkSynthesis
+
+class ResistorNetworkSynthesisTests(unittest.TestCase):
+	@staticmethod
+	def _all_networks(values, max_parts):
+		networks = { 1: set(float(value) for value in values) }
+		for part_count in range(2, max_parts + 1):
+			networks[part_count] = set()
+			for left_count in range(1, part_count // 2 + 1):
+				for left in networks[left_count]:
+					for right in networks[part_count - left_count]:
+						for operator in "SP":
+							networks[part_count].add(ResistorNetworkSynthesis.canonicalize((operator, left, right)))
+		return [ (ResistorNetworkSynthesis.evaluate(topology), part_count, topology) for (part_count, topologies) in networks.items() for topology in topologies ]
+
+	def test_canonicalize(self):
+		self.assertEqual(ResistorNetworkSynthesis.canonicalize(("S", 2.0, ("S", 3.0, 1.0))), ("S", 1.0, 2.0, 3.0))
+		self.assertEqual(ResistorNetworkSynthesis.canonicalize(("P", ("S", 2.0, 1.0), 5.0)), ("P", 5.0, ("S", 1.0, 2.0)))
+		self.assertEqual(ResistorNetworkSynthesis.canonicalize(("S", ("P", 2.0, 2.0), ("P", 1.0, 1.0))), ("S", ("P", 1.0, 1.0), ("P", 2.0, 2.0)))
+
+	def test_evaluate(self):
+		self.assertAlmostEqual(ResistorNetworkSynthesis.evaluate(("S", 1.0, ("P", 2.0, 2.0))), 2.0)
+		self.assertAlmostEqual(ResistorNetworkSynthesis.evaluate(("P", 3.0, 6.0)), 2.0)
+
+	def test_format(self):
+		self.assertEqual(ResistorNetworkSynthesis.format_topology(("S", 1.0, ("P", 2.0, 3.0))), "1.0 + (2.0 ∥ 3.0)")
+		self.assertEqual(ResistorNetworkSynthesis.format_topology(5.0, lambda value: "%.0f Ohm" % (value)), "5 Ohm")
+
+	def test_search_simple(self):
+		synthesis = ResistorNetworkSynthesis([ 100, 220, 470, 1000 ])
+		result = synthesis.search(1100, max_parts = 2, count = 1)[0]
+		self.assertEqual(result.part_count, 2)
+		self.assertEqual(result.topology, ("S", 100.0, 1000.0))
+		self.assertEqual(result.error, 0)
+
+		result = synthesis.search(50, max_parts = 2, count = 1)[0]
+		self.assertEqual(result.topology, ("P", 100.0, 100.0))
+
+		# Fewer parts are preferred when equally good
+		result = synthesis.search(470, max_parts = 4, count = 1)[0]
+		self.assertEqual(result.topology, 470.0)
+
+	def test_search_against_exhaustive(self):
+		rng = random.Random(0)
+		for iteration in range(30):
+			values = set(rng.choice([ 1.0, 1.5, 2.2, 3.3, 4.7, 6.8 ]) * (10 ** rng.randint(0, 3)) for _ in range(rng.randint(1, 6)))
+			max_parts = rng.randint(1, 4)
+			count = rng.randint(1, 20)
+			target = rng.uniform(0.3, 5000)
+			expected = sorted((abs((value - target) / target), part_count) for (value, part_count, topology) in self._all_networks(values, max_parts))[ : count]
+			results = ResistorNetworkSynthesis(values).search(target, max_parts = max_parts, count = count)
+			self.assertEqual(len(results), len(expected))
+			for (result, (expected_error, expected_part_count)) in zip(results, expected):
+				self.assertAlmostEqual(abs(result.error), expected_error)
+				self.assertEqual(result.part_count, expected_part_count)
+				self.assertAlmostEqual(ResistorNetworkSynthesis.evaluate(result.topology), result.value)
+			self.assertEqual(len(set(result.topology for result in results)), len(results))
+
+	def test_concurrent_searches(self):
+		values = [ 10 * 1.1 ** i for i in range(60) ]
+		targets = [ 123, 4567, 89.1, 2345, 678 ]
+		expected = [ ResistorNetworkSynthesis(values).search(target) for target in targets ]
+
+		# All threads start searching on a fresh instance at once, so they
+		# race for the (lazily built) pair table
+		synthesis = ResistorNetworkSynthesis(values)
+		barrier = threading.Barrier(len(targets))
+		results = { }
+		def search(index):
+			barrier.wait()
+			results[index] = synthesis.search(targets[index])
+		threads = [ threading.Thread(target = search, args = (index, )) for index in range(len(targets)) ]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual([ results[index] for index in range(len(targets)) ], expected)
@@ -0,0 +1,88 @@
+#	pyengineer - Helping hand for electronics and mechanical engineering
+#	Copyright (C) 2012-2018 Johannes Bauer
+#
+#	This file is part of pyengineer.
+#
+#	pyengineer is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyengineer is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyengineer; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sqlite3
+import tempfile
+import unittest
+import unittest.mock
+from pyengineer.SharedCache import SharedCache
+
+class SharedCacheTests(unittest.TestCase):
+	def setUp(self):
+		self._tempdir = tempfile.TemporaryDirectory()
+		self._filename = os.path.join(self._tempdir.name, "cache.sqlite3")
+
+	def tearDown(self):
+		self._tempdir.cleanup()
+
+	def test_get_put(self):
+		cache = SharedCache(self._filename)
+		self.assertEqual(cache.get("foo"), None)
+		cache.put("foo", "bar")
+		cache.put("bin", b"\x00\x01")
+		self.assertEqual(cache.get("foo"), "bar")
+		self.assertEqual(cache.get("bin"), b"\x00\x01")
+		self.assertIn("foo", cache)
+		self.assertEqual(cache.hits, 2)
+		self.assertEqual(cache.misses, 1)
+
+	def test_shared(self):
+		cache1 = SharedCache(self._filename)
+		cache2 = SharedCache(self._filename)
+		cache1.put("foo", "bar")
+		self.assertEqual(cache2.get("foo"), "bar")
+
+	def test_ttl(self):
+		cache = SharedCache(self._filename, ttl = -1)
+		cache.put("foo", "bar")
+		self.assertEqual(cache.get("foo"), None)
+		cache.evict()
+		self.assertEqual(len(cache), 0)
+
+	def test_max_entries(self):
+		cache = SharedCache(self._filename, max_entries = 5)
+		for i in range(8):
+			cache.put("key%d" % (i), i)
+		cache.evict()
+		self.assertEqual(len(cache), 5)
+		self.assertIn("key7", cache)
+		self.assertNotIn("key0", cache)
+
+	def test_discard_prefix(self):
+		cache = SharedCache(self._filename)
+		cache.put("foo%1", 1)
+		cache.put("foo%2", 2)
+		cache.put("foo_1", 3)
+		cache.discard_prefix("foo%")
+		self.assertEqual(len(cache), 1)
+		self.assertIn("foo_1", cache)
+
+	def test_database_error(self):
+		cache = SharedCache(self._filename)
+		cache.put("foo", "bar")
+		error = sqlite3.OperationalError("database is locked")
+		with unittest.mock.patch.object(SharedCache, "_connection", new_callable = unittest.mock.PropertyMock, side_effect = error), unittest.mock.patch("builtins.print"):
+			self.assertEqual(cache.get("foo", 123), 123)
+			cache.put("bar", "baz")
+		self.assertEqual(cache.misses, 1)
+		self.assertEqual(cache.get("foo"), "bar")
+		self.assertNotIn("bar", cache)
@@ -20,6 +20,7 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 import unittest
+from fractions import Fraction
 from pyengineer import UnitValue
 
 class UnitValueTests(unittest.TestCase):
@@ -121,3 +122,67 @@ class UnitValueTests(unittest.TestCase):
 	def test_reformat_1u(self):
 		value = UnitValue("1u")
 		self.assertEqual(value.format(significant_digits = 3), "1.00 µ")
+
+	def test_float_matches_exact(self):
+		for text in [ "1.1k", "0.01M", "4.7n", "33", "-2.2u", "1e3k", "3/4m", ".5c" ]:
+			value = UnitValue(text)
+			self.assertEqual(float(value), float(value.exact_value))
+
+	def test_exact_value(self):
+		self.assertEqual(UnitValue("1.1k").exact_value, Fraction(1100))
+		self.assertEqual(UnitValue("100n").exact_value, Fraction(1, 10000000))
+		self.assertEqual(UnitValue("1e3k").exact_value, Fraction(1000000))
+		self.assertEqual(UnitValue(Fraction(1, 3)).exact_value, Fraction(1, 3))
+		self.assertEqual(UnitValue(UnitValue("3/4m")).exact_value, Fraction(3, 4000))
+
+	def test_compare(self):
+		self.assertEqual(UnitValue("10000"), UnitValue("0.01M"))
+		self.assertEqual(hash(UnitValue("10000")), hash(UnitValue("0.01M")))
+		self.assertLess(UnitValue("999"), UnitValue("1k"))
+		self.assertGreater(UnitValue("1.1k"), UnitValue(1100 - 1e-9))
+
+	def test_invalid(self):
+		with self.assertRaises(ValueError):
+			UnitValue("inf")
+		with self.assertRaises(ValueError):
+			UnitValue("")
+		with self.assertRaises(ValueError):
+			UnitValue("12x")
+
+	def test_not_finite(self):
+		with self.assertRaises(ValueError):
+			UnitValue(float("nan"))
+		with self.assertRaises(ValueError):
+			UnitValue(float("-inf"))
+		with self.assertRaises(ValueError):
+			UnitValue("1e400")
+		with self.assertRaises(ValueError):
+			UnitValue("1e400k")
+		with self.assertRaises(ValueError):
+			UnitValue(10 ** 400)
+		with self.assertRaises(ValueError):
+			UnitValue(Fraction(10 ** 400, 3))
+
+	def test_parse_notation(self):
+		self.assertEqual(float(UnitValue("+4.7k")), 4700)
+		self.assertEqual(float(UnitValue("10 k")), 10000)
+		self.assertEqual(float(UnitValue("1.5e-3k")), 1.5)
+		self.assertEqual(float(UnitValue("2E")), 2e15)
+		self.assertEqual(float(UnitValue("2E3")), 2000)
+		self.assertEqual(float(UnitValue("47c")), 0.47)
+		self.assertEqual(float(UnitValue("100n\n")), 100e-9)
+		self.assertEqual(UnitValue("2.2µ").exact_value, Fraction(22, 10000000))
+
+	def test_format_negative_extreme(self):
+		self.assertEqual(UnitValue(-1.23e18).format(significant_digits = 3), "-1230 E")
+		self.assertEqual(UnitValue(-1.23e-17).format(significant_digits = 3), "-0.0123 f")
+
+	def test_format_many(self):
+		values = [ 0, 1.23e-13, -4.7e3, UnitValue("1u"), 1.23e19 ]
+		self.assertEqual(UnitValue.format_many(values), [ "0.00 ", "123 f", "-4.70 k", "1.00 µ", "12300 E" ])
+		self.assertEqual(UnitValue.format_many(values, significant_digits = 4), [ UnitValue(value).format(significant_digits = 4) for value in values ])
+
+	def test_to_dict_many(self):
+		values = [ "10k", "4.7n", "33" ]
+		self.assertEqual(UnitValue.to_dict_many(UnitValue(value) for value in values), [ UnitValue(value).to_dict() for value in values ])
+		self.assertEqual(UnitValue.to_dict_many([ 1500.0 ]), [ { "flt": 1500.0, "fmt": "1.50 k" } ])
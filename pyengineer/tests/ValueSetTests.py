@@ -21,6 +21,7 @@
 
 import unittest
 from pyengineer.ValueSets import ValueSets, UnitValue
+from pyengineer.Exceptions import DataMissingException, CircularReferenceException
 
 class ValueSetTests(unittest.TestCase):
 	def test_explicit(self):
@@ -97,3 +98,129 @@ class ValueSetTests(unittest.TestCase):
 		self.assertEqual(vs.find_closest(24), (UnitValue(9), UnitValue(25)))
 		self.assertEqual(vs.find_closest(25), (UnitValue(25), None))
 		self.assertEqual(vs.find_closest(1234), (UnitValue(25), None))
+
+	def test_iter_range(self):
+		data = [
+			{
+				"name":		"foobar",
+				"type":		"explicit",
+				"items":	[ "5", "7", "8", "9", "25" ],
+			}
+		]
+		vs = ValueSets.from_dict(data)["foobar"]
+		self.assertEqual(list(vs.float_index), [ 5, 7, 8, 9, 25 ])
+		self.assertEqual(list(vs.iter_range(7.5, 8.5)), [ UnitValue(7), UnitValue(8), UnitValue(9) ])
+		self.assertEqual(list(vs.iter_range("7", UnitValue(8))), [ UnitValue(7), UnitValue(8), UnitValue(9) ])
+		self.assertEqual(list(vs.iter_range(0, 1)), [ UnitValue(5) ])
+		self.assertEqual(list(vs.iter_range(100, 200)), [ UnitValue(25) ])
+
+	def test_find_closest_many(self):
+		data = [
+			{
+				"name":		"foobar",
+				"type":		"explicit",
+				"items":	[ "5", "7", "8", "9", "25" ],
+			}
+		]
+		vs = ValueSets.from_dict(data)["foobar"]
+		values = [ 1234, 6, 0, 25, 8, -3, "7", 24, 5, 8.5 ]
+		(smaller_indices, larger_indices) = vs.find_closest_many(values)
+		self.assertEqual(smaller_indices, [ 4, 0, None, 4, 2, None, 1, 3, 0, 2 ])
+		self.assertEqual(larger_indices, [ None, 1, 0, None, 3, 0, 2, 4, 1, 3 ])
+		self.assertEqual(list(vs.iter_closest_many(values)), [ tuple(vs.iter_closest(value)) for value in values ])
+		self.assertEqual(vs.find_closest_many([ ]), ([ ], [ ]))
+
+	def test_find_closest_many_large(self):
+		data = [ { "name": "foobar", "type": "eseries", "series": 96, "min": "1", "max": "10M" } ]
+		vs = ValueSets.from_dict(data)["foobar"]
+		values = [ 0.5, 12.3, 12.3, 47e3, 1e8, 100, 9.99e6 ]
+		self.assertEqual(list(vs.iter_closest_many(values)), [ tuple(vs.iter_closest(value)) for value in values ])
+
+	def test_nested_union(self):
+		data = [
+			{
+				"name":		"all",
+				"type":		"union",
+				"groups":	[ "foobar", "baz" ],
+			},
+			{
+				"name":		"foobar",
+				"type":		"union",
+				"groups":	[ "foo", "bar" ],
+			},
+			{
+				"name":		"foo",
+				"type":		"explicit",
+				"items":	[ "1k", "5", "1" ],
+			},
+			{
+				"name":		"bar",
+				"type":		"explicit",
+				"items":	[ "3", "5", "1" ],
+			},
+			{
+				"name":		"baz",
+				"type":		"eseries",
+				"series":	3,
+				"min":		"1",
+				"max":		"10",
+			},
+		]
+		sets = ValueSets.from_dict(data)
+		self.assertEqual([ float(x) for x in sets["foobar"] ], [ 1, 3, 5, 1e3 ])
+		self.assertEqual([ float(x) for x in sets["all"] ], [ 1, 2.2, 3, 4.7, 5, 10, 1e3 ])
+
+	def test_circular_union(self):
+		data = [
+			{
+				"name":		"foo",
+				"type":		"union",
+				"groups":	[ "bar" ],
+			},
+			{
+				"name":		"bar",
+				"type":		"union",
+				"groups":	[ "baz" ],
+			},
+			{
+				"name":		"baz",
+				"type":		"union",
+				"groups":	[ "foo" ],
+			},
+		]
+		with self.assertRaises(CircularReferenceException):
+			ValueSets.from_dict(data)
+
+	def test_undefined_union_member(self):
+		data = [
+			{
+				"name":		"foo",
+				"type":		"union",
+				"groups":	[ "bar" ],
+			},
+		]
+		with self.assertRaises(DataMissingException):
+			ValueSets.from_dict(data)
+
+	def test_lazy_creation(self):
+		data = [
+			{ "name": "broken", "type": "catalog", "filename": "/nonexistent/parts.csv" },
+			{ "name": "small", "type": "explicit", "items": [ 1, 2 ] },
+			{ "name": "union", "type": "union", "groups": [ "small" ] },
+		]
+		sets = ValueSets.from_dict(data)
+		self.assertEqual([ float(x) for x in sets["union"] ], [ 1, 2 ])
+		with self.assertRaises(FileNotFoundError):
+			sets["broken"]
+		with self.assertRaises(KeyError):
+			sets["nonexistent"]
+
+	def test_shared_sub_unions(self):
+		# Every level references both sets of the previous one, so checking
+		# each path individually would take exponential time
+		data = [ { "name": "a0", "type": "explicit", "items": [ 1 ] }, { "name": "b0", "type": "explicit", "items": [ 2 ] } ]
+		for level in range(1, 40):
+			data.append({ "name": "a%d" % (level), "type": "union", "groups": [ "a%d" % (level - 1), "b%d" % (level - 1) ] })
+			data.append({ "name": "b%d" % (level), "type": "union", "groups": [ "a%d" % (level - 1), "b%d" % (level - 1) ] })
+		sets = ValueSets.from_dict(data)
+		self.assertEqual([ float(x) for x in sets["a39"] ], [ 1, 2 ])
@@ -28,3 +28,16 @@ from .ValueSetTests import ValueSetTests
 from .FractionalRepresentationTests import FractionalRepresentationTests
 from .NewtonSolverTests import NewtonSolverTests
 from .SortedListTests import SortedListTests
+from .OrderedSetTests import OrderedSetTests
+from .PartCatalogTests import PartCatalogTests
+from .LRUCacheTests import LRUCacheTests
+from .SharedCacheTests import SharedCacheTests
+from .PluginLoaderTests import PluginLoaderTests
+from .PluginWatcherTests import PluginWatcherTests
+from .ResistorNetworkSynthesisTests import ResistorNetworkSynthesisTests
+from .CachedResponseTests import CachedResponseTests
+from .GUIApplicationTests import GUIApplicationTests
+from .ASGIApplicationTests import ASGIApplicationTests
+from .PluginProcessPoolTests import PluginProcessPoolTests
+from .LocalTemplateLookupTests import LocalTemplateLookupTests
+from .BasicParallelResistorsTests import BasicParallelResistorsTests
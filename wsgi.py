@@ -27,8 +27,10 @@ gui_application = GUIApplication(config)
 
 if __name__ == "__main__":
 	import os
-	plugin_dir = "plugins/"
 	extra_files = [ "configuration.json" ]
-	extra_files += [ plugin_dir + filename for filename in filter(lambda name: name.endswith(".py"), os.listdir(plugin_dir)) ]
+	if config.plugin_reload_interval is None:
+		# Plugins are not reloaded in-process, restart the server instead
+		plugin_dir = config.plugin_directory + "/"
+		extra_files += [ plugin_dir + filename for filename in filter(lambda name: name.endswith(".py"), os.listdir(plugin_dir)) ]
 	extra_files += [ "pyengineer/templates/" + filename for filename in filter(lambda name: name.endswith(".html"), os.listdir("pyengineer/templates/")) ]
 	gui_application.app.run(debug = True, extra_files = extra_files)